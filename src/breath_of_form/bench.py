@@ -0,0 +1,98 @@
+"""Per-circle cost of the breathing pass: per-frame trig vs. breath cycle tables.
+
+Run with: python src/breath_of_form/bench.py
+"""
+
+import math
+import random
+import timeit
+
+BREATH_CYCLE = 180
+FRAMES = 30
+
+
+def make_circles(count):
+    rng = random.Random(0)
+    xs = [rng.uniform(56, 456) for _ in range(count)]
+    ys = [rng.uniform(56, 456) for _ in range(count)]
+    bases = [rng.randint(15, 45) for _ in range(count)]
+    phases = [rng.randint(0, 180) for _ in range(count)]
+    return xs, ys, bases, phases
+
+
+def breathe_trig(time, xs, ys, bases, phase_offsets):
+    """Breathing as computed before the tables (sin, sin, cos per circle)"""
+    cycle = BREATH_CYCLE
+    step = 2 * math.pi / cycle
+    phases = [(time + phase) % cycle for phase in phase_offsets]
+    sizes = [
+        max(5, int(base * (1 + 0.5 * math.sin(p * step))))
+        for base, p in zip(bases, phases)
+    ]
+    sway_xs = [int(x + int(3 * math.sin(p * 0.1))) for x, p in zip(xs, phases)]
+    sway_ys = [int(y + int(2 * math.cos(p * 0.07))) for y, p in zip(ys, phases)]
+    return sizes, sway_xs, sway_ys
+
+
+def make_tables():
+    cycle = BREATH_CYCLE
+    factors = [1 + 0.5 * math.sin(p * 2 * math.pi / cycle) for p in range(cycle)]
+    size_tables = {
+        base: [max(5, int(base * factor)) for factor in factors]
+        for base in range(15, 46)
+    }
+    sway_x = [int(3 * math.sin(p * 0.1)) for p in range(cycle)]
+    sway_y = [int(2 * math.cos(p * 0.07)) for p in range(cycle)]
+    return size_tables, sway_x, sway_y
+
+
+def breathe_tables(time, xs, ys, size_rows, phase_offsets, sway_x, sway_y):
+    """Breathing as computed by BreathOfForm.draw (table lookups only)"""
+    cycle = BREATH_CYCLE
+    phases = [(time + phase) % cycle for phase in phase_offsets]
+    sizes = [row[p] for row, p in zip(size_rows, phases)]
+    sway_xs = [int(x + sway_x[p]) for x, p in zip(xs, phases)]
+    sway_ys = [int(y + sway_y[p]) for y, p in zip(ys, phases)]
+    return sizes, sway_xs, sway_ys
+
+
+def main():
+    size_tables, sway_x, sway_y = make_tables()
+    print(f"{'circles':>8} {'trig ns/circle':>15} {'tables ns/circle':>17} {'speedup':>8}")
+    for count in (24, 240, 2400, 24000):
+        xs, ys, bases, phases = make_circles(count)
+        size_rows = [size_tables[base] for base in bases]
+
+        # Both passes must agree frame for frame
+        for time in range(BREATH_CYCLE):
+            assert breathe_trig(time, xs, ys, bases, phases) == breathe_tables(
+                time, xs, ys, size_rows, phases, sway_x, sway_y
+            )
+
+        number = max(1, 24000 // count)
+        trig = min(
+            timeit.repeat(
+                lambda: [breathe_trig(t, xs, ys, bases, phases) for t in range(FRAMES)],
+                number=number,
+                repeat=3,
+            )
+        )
+        tables = min(
+            timeit.repeat(
+                lambda: [
+                    breathe_tables(t, xs, ys, size_rows, phases, sway_x, sway_y)
+                    for t in range(FRAMES)
+                ],
+                number=number,
+                repeat=3,
+            )
+        )
+        scale = 1e9 / (number * FRAMES * count)
+        print(
+            f"{count:>8} {trig * scale:>15.1f} {tables * scale:>17.1f} "
+            f"{trig / tables:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
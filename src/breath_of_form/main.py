@@ -11,7 +11,7 @@ import random
 
 
 class BreathOfForm:
-    def __init__(self):
+    def __init__(self, max_circles=24, initial_circles=12):
         pyxel.init(512, 512, title="Breath of Form")
 
         # Marimba-style sound definition
@@ -27,13 +27,48 @@ class BreathOfForm:
         self.time = 0
         self.breath_cycle = 180
 
-        # Dynamic circle management
-        self.max_circles = 24
-        self.circles = []
+        # Dynamic circle management (24 by default; thousands for a large population)
+        self.max_circles = max_circles
+        self.initial_circles = initial_circles
         self.connection_timer = 0
         self.connection_duration = 0
         self.current_connections = []
 
+        # Larger populations: smaller circles, shorter reach, sparser sounds
+        density = min(1.0, 24 / max_circles)
+        self.size_scale = max(0.1, math.sqrt(density))
+        self.min_size = max(1, round(5 * self.size_scale))
+
+        # Breath cycle tables, indexed by (time + phase) % breath_cycle
+        cycle = self.breath_cycle
+        self.breath_factor_table = [
+            1 + 0.5 * math.sin(p * 2 * math.pi / cycle) for p in range(cycle)
+        ]
+        self.sway_x_table = [int(3 * math.sin(p * 0.1)) for p in range(cycle)]
+        self.sway_y_table = [int(2 * math.cos(p * 0.07)) for p in range(cycle)]
+        self.size_tables = {}  # base size -> drawn size per breath phase
+        self.connection_radius = 120 * math.sqrt(density)
+        self.sound_scale = density
+        self.spawn_rate = 0.02 * initial_circles / 12  # Spawns per frame
+
+        # Circle state, one entry per circle in parallel arrays
+        self.count = 0
+        self.circle_x = []
+        self.circle_y = []
+        self.base_size = []
+        self.size_row = []
+        self.phase = []
+        self.color = []
+        self.sound_trigger = []
+        self.lifetime = []
+        self.age = []
+        self.sound_id = []
+
+        # Spatial grid for nearby connections, rebuilt when circles spawn or die
+        self.grid_cell = max(8, math.ceil(self.connection_radius))
+        self.grid = {}
+        self.grid_dirty = True
+
         # Generate initial circles
         self.spawn_initial_circles()
 
@@ -41,102 +76,156 @@ class BreathOfForm:
 
     def spawn_initial_circles(self):
         """Generate initial circles"""
-        for i in range(12):
+        for i in range(self.initial_circles):
             self.spawn_circle()
 
     def spawn_circle(self):
         """Generate a new circle"""
-        if len(self.circles) >= self.max_circles:
+        if self.count >= self.max_circles:
             return
 
         # Random position (placed around center)
         angle = random.uniform(0, 2 * math.pi)
         radius = random.uniform(80, 200)
-        x = 256 + radius * math.cos(angle)
-        y = 256 + radius * math.sin(angle)
-
-        circle = {
-            "x": x,
-            "y": y,
-            "base_size": random.randint(15, 45),
-            "phase": random.randint(0, 180),
-            "color": 8 + random.randint(0, 6),
-            "sound_trigger": random.random() < 0.3,  # 30% chance for sound
-            "lifetime": random.randint(300, 900),  # 5-15 seconds lifespan
-            "age": 0,
-            "birth_time": self.time,
-            "sound_id": random.randint(0, 3),
-        }
-
-        self.circles.append(circle)
+        self.circle_x.append(256 + radius * math.cos(angle))
+        self.circle_y.append(256 + radius * math.sin(angle))
+        base_size = max(2, int(random.randint(15, 45) * self.size_scale))
+        self.base_size.append(base_size)
+        self.size_row.append(self.get_size_table(base_size))
+        self.phase.append(random.randint(0, 180))
+        self.color.append(8 + random.randint(0, 6))
+        self.sound_trigger.append(
+            random.random() < 0.3 * self.sound_scale
+        )  # 30% chance for sound
+        self.lifetime.append(random.randint(300, 900))  # 5-15 seconds lifespan
+        self.age.append(0)
+        self.sound_id.append(random.randint(0, 3))
+        self.count += 1
+        self.grid_dirty = True
 
         # Appearance sound
-        if random.random() < 0.5:
+        if random.random() < 0.5 * self.sound_scale:
             pyxel.play(2, 5, loop=False)
 
-    def remove_circle(self, circle):
-        """Remove a circle"""
-        if circle in self.circles:
-            # Disappearance sound
-            if random.random() < 0.3:
-                pyxel.play(2, 6, loop=False)
-            self.circles.remove(circle)
+    def remove_circle(self, index):
+        """Remove a circle (the last circle takes its slot)"""
+        # Disappearance sound
+        if random.random() < 0.3 * self.sound_scale:
+            pyxel.play(2, 6, loop=False)
+
+        last = self.count - 1
+        for values in (
+            self.circle_x,
+            self.circle_y,
+            self.base_size,
+            self.size_row,
+            self.phase,
+            self.color,
+            self.sound_trigger,
+            self.lifetime,
+            self.age,
+            self.sound_id,
+        ):
+            values[index] = values[last]
+            values.pop()
+        self.count = last
+        self.grid_dirty = True
+
+    def get_size_table(self, base_size):
+        """Drawn size over the breath cycle, shared by circles of one base size"""
+        table = self.size_tables.get(base_size)
+        if table is None:
+            table = [
+                max(self.min_size, int(base_size * factor))
+                for factor in self.breath_factor_table
+            ]
+            self.size_tables[base_size] = table
+        return table
+
+    def build_grid(self):
+        """Bucket circle indices by grid cell"""
+        grid = {}
+        cell = self.grid_cell
+        for i in range(self.count):
+            key = (int(self.circle_x[i]) // cell, int(self.circle_y[i]) // cell)
+            bucket = grid.get(key)
+            if bucket is None:
+                grid[key] = [i]
+            else:
+                bucket.append(i)
+        self.grid = grid
+        self.grid_dirty = False
+
+    def nearby_pairs(self):
+        """Yield index pairs closer than the connection radius"""
+        if self.grid_dirty:
+            self.build_grid()
+
+        grid = self.grid
+        xs, ys = self.circle_x, self.circle_y
+        limit = self.connection_radius * self.connection_radius
+        for (gx, gy), bucket in grid.items():
+            # Same cell, then the four forward neighbours (each pair once)
+            for n, i in enumerate(bucket):
+                for j in bucket[n + 1 :]:
+                    if (xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2 < limit:
+                        yield i, j
+            for key in ((gx + 1, gy - 1), (gx + 1, gy), (gx + 1, gy + 1), (gx, gy + 1)):
+                other = grid.get(key)
+                if other is None:
+                    continue
+                for i in bucket:
+                    for j in other:
+                        if (xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2 < limit:
+                            yield i, j
 
     def generate_random_connections(self):
         """Generate random connection patterns"""
-        if len(self.circles) < 2:
+        if self.count < 2:
             return []
 
+        xs, ys = self.circle_x, self.circle_y
         connections = []
         connection_type = random.randint(0, 5)
 
         if connection_type == 0:
             # Radial from center
-            selected = random.sample(self.circles, min(6, len(self.circles)))
-            for circle in selected:
-                connections.append(((256, 256), (circle["x"], circle["y"]), 13))
+            selected = random.sample(range(self.count), min(6, self.count))
+            for i in selected:
+                connections.append(((256, 256), (xs[i], ys[i]), 13))
 
         elif connection_type == 1:
             # Random pair connections
-            num_pairs = random.randint(2, min(8, len(self.circles) // 2))
-            selected = random.sample(self.circles, num_pairs * 2)
-            for i in range(0, len(selected), 2):
-                if i + 1 < len(selected):
-                    c1, c2 = selected[i], selected[i + 1]
-                    connections.append(((c1["x"], c1["y"]), (c2["x"], c2["y"]), 11))
+            num_pairs = random.randint(2, min(8, self.count // 2))
+            selected = random.sample(range(self.count), num_pairs * 2)
+            for n in range(0, len(selected), 2):
+                if n + 1 < len(selected):
+                    i, j = selected[n], selected[n + 1]
+                    connections.append(((xs[i], ys[i]), (xs[j], ys[j]), 11))
 
         elif connection_type == 2:
             # Connect nearby circles
-            for i, c1 in enumerate(self.circles):
-                for j, c2 in enumerate(self.circles[i + 1 :], i + 1):
-                    dist = math.sqrt(
-                        (c1["x"] - c2["x"]) ** 2 + (c1["y"] - c2["y"]) ** 2
-                    )
-                    if dist < 120 and random.random() < 0.4:
-                        connections.append(((c1["x"], c1["y"]), (c2["x"], c2["y"]), 9))
+            for i, j in self.nearby_pairs():
+                if random.random() < 0.4:
+                    connections.append(((xs[i], ys[i]), (xs[j], ys[j]), 9))
 
         elif connection_type == 3:
             # Star pattern
-            if len(self.circles) >= 5:
-                selected = random.sample(self.circles, 5)
-                for i in range(5):
-                    next_i = (i + 2) % 5
-                    c1, c2 = selected[i], selected[next_i]
-                    connections.append(((c1["x"], c1["y"]), (c2["x"], c2["y"]), 12))
+            if self.count >= 5:
+                selected = random.sample(range(self.count), 5)
+                for n in range(5):
+                    i, j = selected[n], selected[(n + 2) % 5]
+                    connections.append(((xs[i], ys[i]), (xs[j], ys[j]), 12))
 
         elif connection_type == 4:
             # Triangle clusters
-            if len(self.circles) >= 3:
+            if self.count >= 3:
                 num_triangles = random.randint(1, 3)
                 for _ in range(num_triangles):
-                    if len(self.circles) >= 3:
-                        triangle = random.sample(self.circles, 3)
-                        for i in range(3):
-                            next_i = (i + 1) % 3
-                            c1, c2 = triangle[i], triangle[next_i]
-                            connections.append(
-                                ((c1["x"], c1["y"]), (c2["x"], c2["y"]), 10)
-                            )
+                    triangle = random.sample(range(self.count), 3)
+                    for n in range(3):
+                        i, j = triangle[n], triangle[(n + 1) % 3]
+                        connections.append(((xs[i], ys[i]), (xs[j], ys[j]), 10))
 
         return connections
 
@@ -144,22 +233,27 @@ class BreathOfForm:
         if pyxel.btnp(pyxel.KEY_Q):
             pyxel.quit()
 
-        # Update circles and lifecycle management
-        for circle in self.circles[:]:  # Iterate over copy
-            circle["age"] += 1
+        # Update circles and lifecycle management (backwards, so removal
+        # only moves circles that were already updated)
+        age = self.age
+        for i in range(self.count - 1, -1, -1):
+            age[i] += 1
 
             # Breathing sound trigger
-            if circle["sound_trigger"]:
-                breath_phase = (self.time + circle["phase"]) % self.breath_cycle
+            if self.sound_trigger[i]:
+                breath_phase = (self.time + self.phase[i]) % self.breath_cycle
                 if breath_phase == 0:
-                    pyxel.play(0, circle["sound_id"], loop=False)
+                    pyxel.play(0, self.sound_id[i], loop=False)
 
             # Lifespan check
-            if circle["age"] > circle["lifetime"]:
-                self.remove_circle(circle)
-
-        # Generate new circles randomly
-        if random.random() < 0.02:  # 2% chance
+            if age[i] > self.lifetime[i]:
+                self.remove_circle(i)
+
+        # Generate new circles randomly (2% chance per frame by default)
+        spawns = int(self.spawn_rate)
+        if random.random() < self.spawn_rate - spawns:
+            spawns += 1
+        for _ in range(spawns):
             self.spawn_circle()
 
         # Connection management
@@ -180,36 +274,28 @@ class BreathOfForm:
         # Deep blue background
         pyxel.cls(1)
 
-        # Draw circles
-        for circle in self.circles:
-            # Breathing calculation
-            breath_phase = (self.time + circle["phase"]) % self.breath_cycle
-            breath_ratio = math.sin(breath_phase * 2 * math.pi / self.breath_cycle)
-
-            # Size change (breathing only)
-            size_variation = 1 + 0.5 * breath_ratio
-            current_size = max(5, int(circle["base_size"] * size_variation))
-
-            # Position breathing sway
-            x_offset = int(3 * math.sin(breath_phase * 0.1))
-            y_offset = int(2 * math.cos(breath_phase * 0.07))
-
-            x = int(circle["x"] + x_offset)
-            y = int(circle["y"] + y_offset)
+        # Breathing for every circle in one pass of table lookups
+        cycle = self.breath_cycle
+        sway_x, sway_y = self.sway_x_table, self.sway_y_table
+        phases = [(self.time + phase) % cycle for phase in self.phase]
+        sizes = [row[p] for row, p in zip(self.size_row, phases)]
+        xs = [int(x + sway_x[p]) for x, p in zip(self.circle_x, phases)]
+        ys = [int(y + sway_y[p]) for y, p in zip(self.circle_y, phases)]
 
+        # Draw circles
+        for i in range(self.count):
             # Age-based transparency effect (color change representation)
-            age_ratio = circle["age"] / circle["lifetime"]
-            if age_ratio > 0.8:  # Fade after 80% of lifespan
-                color = max(1, circle["color"] - 2)
+            if self.age[i] > 0.8 * self.lifetime[i]:  # Fade after 80% of lifespan
+                color = max(1, self.color[i] - 2)
             else:
-                color = circle["color"]
+                color = self.color[i]
 
             # Draw circle
-            pyxel.circb(x, y, current_size, color)
+            current_size = sizes[i]
+            pyxel.circb(xs[i], ys[i], current_size, color)
 
             # Inner dot
-            inner_size = max(1, current_size // 3)
-            pyxel.circ(x, y, inner_size, color)
+            pyxel.circ(xs[i], ys[i], max(1, current_size // 3), color)
 
         # Draw connection lines
         for connection in self.current_connections:
@@ -0,0 +1,114 @@
+"""Per-comet update cost: per-particle loop vs. batch step with mask culling.
+
+loop and batch do the same work at every count. The thinned column is the
+batch step as storm mode runs it, with trail points thinned above
+TRAIL_COMET_BUDGET comets.
+
+Run with: python src/comet_dust/bench.py
+"""
+
+import random
+import time
+
+from main import TRAIL_COMET_BUDGET, TRAIL_LIFETIMES, Pool, step_comets
+
+FRAMES = 30
+
+
+def step_loop(particles, trails, frame):
+    """Update as done before the batch step (one particle at a time)"""
+    xs, ys, lives = particles.x, particles.y, particles.life
+    vxs, vys, sizes = particles.vx, particles.vy, particles.size
+    for i in range(particles.count - 1, -1, -1):
+        x = xs[i] + vxs[i]
+        y = ys[i] + vys[i]
+        xs[i] = x
+        ys[i] = y
+        lives[i] -= 1
+
+        trails.add(x, y, 15, 15, sizes[i] * 0.7)
+
+        if random.random() < 0.3:
+            trails.add(
+                x + random.uniform(-2, 2),
+                y + random.uniform(-2, 2),
+                10,
+                10,
+                sizes[i] * 0.5,
+            )
+
+        if lives[i] <= 0 or x < 0 or x > 512 or y < 0 or y > 512:
+            particles.remove(i)
+
+    trail_lives = trails.life
+    for i in range(trails.count - 1, -1, -1):
+        trail_lives[i] -= 1
+        if trail_lives[i] <= 0:
+            trails.remove(i)
+
+
+def make_particles(count):
+    """count slow, long-lived comets, so the population holds for every frame"""
+    rng = random.Random(0)
+    particles = Pool(
+        count,
+        x='f', y='f', vx='f', vy='f', life='i', max_life='i',
+        size='f', glow_size='f', brightness='f',
+    )
+    for _ in range(count):
+        particles.add(
+            rng.uniform(64, 448), rng.uniform(64, 448),
+            rng.uniform(-1, 1), rng.uniform(-1, 1),
+            1000, 1000,
+            rng.uniform(3, 8), rng.uniform(8, 15), rng.uniform(0.7, 1.0),
+        )
+    return particles
+
+
+def loop_trails(count):
+    return Pool(count * 25, x='f', y='f', life='i', max_life='i', size='f')
+
+
+def batch_trails(count):
+    return [
+        Pool(count * lifetime, x='f', y='f', expire='i', size='f')
+        for lifetime in TRAIL_LIFETIMES
+    ]
+
+
+def step_batch(particles, trails, frame):
+    step_comets(particles, trails, frame)
+
+
+def step_thinned(particles, trails, frame):
+    trail_chance = min(1.0, TRAIL_COMET_BUDGET / max(1, particles.count))
+    step_comets(particles, trails, frame, trail_chance)
+
+
+def measure(step, make_trails, count):
+    best = None
+    for _ in range(3):
+        particles = make_particles(count)
+        trails = make_trails(count)
+        start = time.perf_counter()
+        for frame in range(FRAMES):
+            step(particles, trails, frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        assert particles.count == count
+    return best * 1e9 / (FRAMES * count)
+
+
+def main():
+    print(f"{'comets':>7} {'loop ns/comet':>14} {'batch ns/comet':>15} {'speedup':>8}"
+          f" {'thinned ns/comet':>17}")
+    for count in (16, 256, 1024, 4096):
+        loop = measure(step_loop, loop_trails, count)
+        batch = measure(step_batch, batch_trails, count)
+        thinned = measure(step_thinned, batch_trails, count)
+        print(f"{count:>7} {loop:>14.0f} {batch:>15.0f} {loop / batch:>7.2f}x"
+              f" {thinned:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
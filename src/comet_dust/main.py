@@ -10,16 +10,148 @@ Version: 1.0.0
 import pyxel
 import math
 import random
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from operator import add
+
+STAMP_VARIANTS = 4  # Dither patterns per stamp, picked at random each frame
+BRIGHTNESS_STEPS = 8  # Glow brightness buckets per unit of brightness
+TRAIL_LIFETIMES = (15, 10)  # Main trail point, jittered trail point
+TRAIL_COMET_BUDGET = 256  # Above this many comets, trails and sparks thin out
+
+class Pool:
+    """Fixed-capacity struct-of-arrays storage, live entries packed at the front"""
+    def __init__(self, capacity, **fields):
+        self.capacity = capacity
+        self.count = 0
+        self.columns = []
+        for name, typecode in fields.items():
+            column = array(typecode, [0]) * capacity
+            setattr(self, name, column)
+            self.columns.append(column)
+            
+    def add(self, *values):
+        """Fill the next free slot (values in field order); False when full"""
+        if self.count >= self.capacity:
+            return False
+        index = self.count
+        for column, value in zip(self.columns, values):
+            column[index] = value
+        self.count += 1
+        return True
+        
+    def extend(self, *values):
+        """Append a batch (one sequence per field, in field order); overflow is dropped"""
+        start = self.count
+        size = min(len(values[0]), self.capacity - start)
+        for column, batch in zip(self.columns, values):
+            column[start:start + size] = array(column.typecode, batch[:size])
+        self.count = start + size
+        
+    def remove(self, index):
+        """Free a slot by moving the last live entry into it"""
+        last = self.count - 1
+        if index != last:
+            for column in self.columns:
+                column[index] = column[last]
+        self.count = last
+        
+    def drop_front(self, size):
+        """Remove the first size live entries, keeping the rest in order"""
+        count = self.count
+        for column in self.columns:
+            column[:count - size] = column[size:count]
+        self.count = count - size
+        
+    def cull(self, keep):
+        """Keep only the live entries whose mask value is true, in order"""
+        kept = 0
+        for column in self.columns:
+            survivors = array(column.typecode, compress(column[:self.count], keep))
+            kept = len(survivors)
+            column[:kept] = survivors
+        self.count = kept
+
+def poisson(mean):
+    """Number of events in one frame for a Poisson process"""
+    if mean > 30:
+        # Normal approximation for storm-sized rates
+        return max(0, round(random.gauss(mean, math.sqrt(mean))))
+    limit = math.exp(-mean)
+    count = 0
+    product = random.random()
+    while product > limit:
+        count += 1
+        product *= random.random()
+    return count
+
+def step_comets(particles, trails, time, trail_chance=1.0):
+    """Move every comet, drop trail points behind it and cull in batch"""
+    count = particles.count
+    xs = array('f', map(add, particles.x[:count], particles.vx[:count]))
+    ys = array('f', map(add, particles.y[:count], particles.vy[:count]))
+    lives = array('i', [life - 1 for life in particles.life[:count]])
+    sizes = particles.size[:count]
+    particles.x[:count] = xs
+    particles.y[:count] = ys
+    particles.life[:count] = lives
+    
+    # One trail point per comet, plus a jittered one for about 30% of them
+    main_trail, jitter_trail = trails
+    main_expire, jitter_expire = (time + lifetime - 1 for lifetime in TRAIL_LIFETIMES)
+    if trail_chance < 1:
+        picks = [i for i in range(count) if random.random() < trail_chance]
+        main_trail.extend(
+            [xs[i] for i in picks],
+            [ys[i] for i in picks],
+            array('i', [main_expire]) * len(picks),
+            [sizes[i] * 0.7 for i in picks],
+        )
+    else:
+        main_trail.extend(xs, ys, array('i', [main_expire]) * count,
+                          [size * 0.7 for size in sizes])
+    extra = [i for i in range(count) if random.random() < 0.3 * trail_chance]
+    jitter_trail.extend(
+        [xs[i] + random.uniform(-2, 2) for i in extra],
+        [ys[i] + random.uniform(-2, 2) for i in extra],
+        array('i', [jitter_expire]) * len(extra),
+        [sizes[i] * 0.5 for i in extra],
+    )
+    
+    particles.cull([
+        life > 0 and 0 <= x <= 512 and 0 <= y <= 512
+        for x, y, life in zip(xs, ys, lives)
+    ])
+    
+    # Trail points are appended in expiry order, so the expired ones lead
+    for trail in trails:
+        trail.drop_front(bisect_right(trail.expire, time, 0, trail.count))
 
 class CometDust:
-    def __init__(self):
+    def __init__(self, max_particles=256, spawn_rate=0.08):
+        # Storm mode: e.g. CometDust(max_particles=4096, spawn_rate=40)
         pyxel.init(512, 512, title="Comet Dust")
         
         self.time = 0
-        self.particles = []
-        self.trails = []
+        self.particles = Pool(
+            max_particles,
+            x='f', y='f', vx='f', vy='f', life='i', max_life='i',
+            size='f', glow_size='f', brightness='f',
+        )
+        # One trail queue per lifetime; a trail point lives while expire > time
+        self.trails = [
+            Pool(max_particles * lifetime, x='f', y='f', expire='i', size='f')
+            for lifetime in TRAIL_LIFETIMES
+        ]
+        self.spawn_rate = spawn_rate  # Mean comets born per frame
+        self.detail = 1.0
         self.jet_timer = 0
         
+        # Glow and trail stamps, rendered the first time each key is drawn
+        self.glow_stamps = {}
+        self.trail_stamps = {}
+        
         self.setup_sound()
         pyxel.run(self.update, self.draw)
 
@@ -45,80 +177,109 @@ class CometDust:
             pyxel.play(0, random.choice([0, 1]))
             self.jet_timer = 0
         
-        if random.random() < 0.08:
-            self.particles.append({
-                'x': random.randint(0, 512),
-                'y': random.randint(0, 512),
-                'vx': random.uniform(-4, 4),
-                'vy': random.uniform(-4, 4),
-                'life': random.randint(40, 120),
-                'max_life': random.randint(40, 120),
-                'size': random.uniform(3, 8),
-                'glow_size': random.uniform(8, 15),
-                'brightness': random.uniform(0.7, 1.0)
-            })
+        births = poisson(self.spawn_rate)
+        for _ in range(births):
+            self.particles.add(
+                random.randint(0, 512),         # x
+                random.randint(0, 512),         # y
+                random.uniform(-4, 4),          # vx
+                random.uniform(-4, 4),          # vy
+                random.randint(40, 120),        # life
+                random.randint(40, 120),        # max_life
+                random.uniform(3, 8),           # size
+                random.uniform(8, 15),          # glow_size
+                random.uniform(0.7, 1.0),       # brightness
+            )
             
-            # Sparkle sound when new particle appears
-            if random.random() < 0.6:
-                pyxel.play(1, random.randint(2, 4))
+        # Sparkle sound when new particles appear
+        if births and random.random() < 0.6:
+            pyxel.play(1, random.randint(2, 4))
         
-        for particle in self.particles[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['life'] -= 1
-            
-            self.trails.append({
-                'x': particle['x'],
-                'y': particle['y'],
-                'life': 15,
-                'max_life': 15,
-                'size': particle.get('size', 2) * 0.7
-            })
-            
-            if random.random() < 0.3:
-                self.trails.append({
-                    'x': particle['x'] + random.uniform(-2, 2),
-                    'y': particle['y'] + random.uniform(-2, 2),
-                    'life': 10,
-                    'max_life': 10,
-                    'size': particle.get('size', 2) * 0.5
-                })
-            
-            if particle['life'] <= 0 or particle['x'] < 0 or particle['x'] > 512 or particle['y'] < 0 or particle['y'] > 512:
-                self.particles.remove(particle)
+        # Detail (trail points, sparks) thins out as the comet count grows
+        self.detail = min(1.0, TRAIL_COMET_BUDGET / max(1, self.particles.count))
+        step_comets(self.particles, self.trails, self.time, self.detail)
+
+    def get_trail_stamps(self, trail_size, life, max_life):
+        """Pre-dithered trail dots for one size and fade step"""
+        key = (trail_size, life, max_life)
+        stamps = self.trail_stamps.get(key)
+        if stamps is None:
+            opacity = life / max_life
+            color = 6 if opacity > 0.7 else 5
+            width = 2 * trail_size + 1
+            stamps = []
+            for _ in range(STAMP_VARIANTS):
+                stamp = pyxel.Image(width, width)
+                stamp.cls(0)
+                for dx in range(-trail_size, trail_size + 1):
+                    for dy in range(-trail_size, trail_size + 1):
+                        if dx*dx + dy*dy <= trail_size*trail_size:
+                            fade = 1 - (math.sqrt(dx*dx + dy*dy) / trail_size)
+                            if random.random() < opacity * fade:
+                                stamp.pset(dx + trail_size, dy + trail_size, color)
+                stamps.append(stamp)
+            self.trail_stamps[key] = stamps
+        return stamps
         
-        for trail in self.trails[:]:
-            trail['life'] -= 1
-            if trail['life'] <= 0:
-                self.trails.remove(trail)
+    def get_glow_stamps(self, size, glow_size, brightness_step, core_color):
+        """Pre-dithered core and glow for one size, glow size and brightness step"""
+        key = (size, glow_size, brightness_step, core_color)
+        stamps = self.glow_stamps.get(key)
+        if stamps is None:
+            brightness = (brightness_step + 0.5) / BRIGHTNESS_STEPS
+            width = 2 * glow_size + 1
+            stamps = []
+            for _ in range(STAMP_VARIANTS):
+                stamp = pyxel.Image(width, width)
+                stamp.cls(0)
+                for dx in range(-glow_size, glow_size + 1):
+                    for dy in range(-glow_size, glow_size + 1):
+                        distance = math.sqrt(dx*dx + dy*dy)
+                        px = dx + glow_size
+                        py = dy + glow_size
+                        if distance <= size:
+                            stamp.pset(px, py, core_color)
+                        elif distance <= glow_size:
+                            glow_intensity = 1 - (distance - size) / (glow_size - size)
+                            if random.random() < glow_intensity * brightness * 0.6:
+                                glow_color = 6 if glow_intensity > 0.5 else 5
+                                stamp.pset(px, py, glow_color)
+                stamps.append(stamp)
+            self.glow_stamps[key] = stamps
+        return stamps
 
     def draw(self):
         pyxel.cls(0)
         
-        for trail in self.trails:
-            if 0 <= trail['x'] < 512 and 0 <= trail['y'] < 512:
-                opacity = trail['life'] / trail['max_life']
-                trail_size = int(trail.get('size', 2))
-                
-                if opacity > 0.3:
-                    color = 6 if opacity > 0.7 else 5
+        blt = pyxel.blt
+        for trails, max_life in zip(self.trails, TRAIL_LIFETIMES):
+            count = trails.count
+            for trail_x, trail_y, expire, trail_size in zip(
+                trails.x[:count], trails.y[:count], trails.expire[:count], trails.size[:count]
+            ):
+                if 0 <= trail_x < 512 and 0 <= trail_y < 512:
+                    life = expire - self.time
+                    trail_size = int(trail_size)
                     
-                    for dx in range(-trail_size, trail_size + 1):
-                        for dy in range(-trail_size, trail_size + 1):
-                            if dx*dx + dy*dy <= trail_size*trail_size:
-                                px = int(trail['x']) + dx
-                                py = int(trail['y']) + dy
-                                if 0 <= px < 512 and 0 <= py < 512:
-                                    fade = 1 - (math.sqrt(dx*dx + dy*dy) / trail_size)
-                                    if random.random() < opacity * fade:
-                                        pyxel.pset(px, py, color)
+                    if life / max_life > 0.3:
+                        stamps = self.get_trail_stamps(trail_size, life, max_life)
+                        stamp = stamps[int(random.random() * STAMP_VARIANTS)]
+                        blt(int(trail_x) - trail_size, int(trail_y) - trail_size,
+                            stamp, 0, 0, stamp.width, stamp.height, 0)
         
-        for particle in self.particles:
-            if 0 <= particle['x'] < 512 and 0 <= particle['y'] < 512:
-                life_ratio = particle['life'] / particle['max_life']
-                size = int(particle.get('size', 3) * life_ratio) + 1
-                glow_size = int(particle.get('glow_size', 6) * life_ratio)
-                brightness = particle.get('brightness', 1.0) * life_ratio
+        particles = self.particles
+        count = particles.count
+        for particle_x, particle_y, life, max_life, size, glow_size, brightness in zip(
+            particles.x[:count], particles.y[:count],
+            particles.life[:count], particles.max_life[:count],
+            particles.size[:count], particles.glow_size[:count],
+            particles.brightness[:count],
+        ):
+            if 0 <= particle_x < 512 and 0 <= particle_y < 512:
+                life_ratio = life / max_life
+                size = int(size * life_ratio) + 1
+                glow_size = int(glow_size * life_ratio)
+                brightness = brightness * life_ratio
                 
                 if life_ratio > 0.8:
                     core_color = 15
@@ -129,25 +290,16 @@ class CometDust:
                 else:
                     core_color = 5
                 
-                center_x = int(particle['x'])
-                center_y = int(particle['y'])
+                center_x = int(particle_x)
+                center_y = int(particle_y)
                 
-                for dx in range(-glow_size, glow_size + 1):
-                    for dy in range(-glow_size, glow_size + 1):
-                        distance = math.sqrt(dx*dx + dy*dy)
-                        px = center_x + dx
-                        py = center_y + dy
-                        
-                        if 0 <= px < 512 and 0 <= py < 512:
-                            if distance <= size:
-                                pyxel.pset(px, py, core_color)
-                            elif distance <= glow_size:
-                                glow_intensity = 1 - (distance - size) / (glow_size - size)
-                                if random.random() < glow_intensity * brightness * 0.6:
-                                    glow_color = 6 if glow_intensity > 0.5 else 5
-                                    pyxel.pset(px, py, glow_color)
+                brightness_step = int(brightness * BRIGHTNESS_STEPS)
+                stamps = self.get_glow_stamps(size, glow_size, brightness_step, core_color)
+                stamp = stamps[int(random.random() * STAMP_VARIANTS)]
+                blt(center_x - glow_size, center_y - glow_size,
+                    stamp, 0, 0, stamp.width, stamp.height, 0)
                 
-                if life_ratio > 0.7 and brightness > 0.8:
+                if life_ratio > 0.7 and brightness > 0.8 and random.random() < self.detail:
                     for _ in range(int(brightness * 8)):
                         spark_angle = random.uniform(0, 2 * math.pi)
                         spark_dist = random.uniform(size, glow_size * 1.5)
@@ -157,4 +309,4 @@ class CometDust:
                             pyxel.pset(spark_x, spark_y, 15)
 
 if __name__ == "__main__":
-    CometDust()
\ No newline at end of file
+    CometDust()
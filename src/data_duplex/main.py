@@ -6,11 +6,32 @@
 # version: 1.0
 
 import pyxel
+import heapq
+import math
 import random
 
+# Bar data types
+BINARY = 0
+ANALOG = 1
+CORRUPT = 2
+
+# Stream pattern strips: 32 bits of 16 px, one 16 px row per stream slot
+STREAM_BITS = 32
+STREAM_BIT_WIDTH = 16
+STREAM_SLOT_HEIGHT = 16
+
+# Pre-generated noise pixel batches
+NOISE_BATCHES = 64
+NOISE_BATCH_SIZE = 100
+
+
+def geometric_delay(rng, probability):
+    """Frames until a per-frame Bernoulli(probability) event next fires"""
+    return int(math.log(1.0 - rng.random()) / math.log(1.0 - probability)) + 1
+
 
 class DataDuplex:
-    def __init__(self):
+    def __init__(self, bar_width=4, max_streams=8, seed=None):
         pyxel.init(512, 512, title="Data Duplex")
 
         # Digital sound definitions
@@ -24,19 +45,65 @@ class DataDuplex:
 
         self.time = 0
 
-        # Barcode parameters
-        self.bar_width = 4
-        self.num_bars = 512 // self.bar_width
-        self.bars = []
+        # Seeded generator: the same seed replays the same run
+        self.random = random.Random(seed)
 
-        # Data streams
-        self.data_streams = []
-        self.max_streams = 8
+        # Barcode parameters (parallel arrays, one entry per bar)
+        self.bar_width = bar_width
+        self.num_bars = 512 // self.bar_width
+        self.bar_height = []
+        self.bar_base_height = []
+        self.bar_stability = []
+        self.bar_data_type = bytearray(self.num_bars)
+
+        # Bar update events: (time, bar index)
+        self.bar_events = []
+
+        # Data streams (arrays indexed by strip slot; motion is closed-form)
+        self.max_streams = max_streams
+        slot_count = max_streams * 2  # A burst can double the stream count
+        self.stream_slots = []  # Active slots in creation order
+        self.stream_y0 = [0] * slot_count
+        self.stream_t0 = [0] * slot_count
+        self.stream_velocity = [0] * slot_count
+        self.stream_width = [0] * slot_count
+
+        # Stream expiry events: (time, slot)
+        self.stream_events = []
+
+        # Pre-rendered pattern strips
+        self.stream_strips = pyxel.Image(
+            STREAM_BITS * STREAM_BIT_WIDTH, slot_count * STREAM_SLOT_HEIGHT
+        )
+        self.free_stream_slots = list(range(slot_count))
 
         # Noise parameters
         self.noise_intensity = 0.3
         self.glitch_probability = 0.02
         self.scan_lines = []
+        self.noise_batches = [
+            [
+                (
+                    self.random.randint(0, 511),
+                    self.random.randint(0, 511),
+                    self.random.choice([0, 7, 15]),
+                )
+                for _ in range(NOISE_BATCH_SIZE)
+            ]
+            for _ in range(NOISE_BATCHES)
+        ]
+
+        # Next frame of each global random event
+        self.next_stream_spawn = geometric_delay(self.random, 0.05) - 1
+        self.next_scan_line = geometric_delay(self.random, 0.1) - 1
+        self.next_glitch = geometric_delay(self.random, self.glitch_probability) - 1
+        self.next_line_glitch = (
+            geometric_delay(self.random, self.glitch_probability * 0.5) - 1
+        )
+
+        # Per-frame effects chosen in update, so draw never touches the RNG
+        self.noise_batch = 0
+        self.line_glitches = []  # (x, y, width, color)
 
         # Initialize
         self.generate_initial_bars()
@@ -46,112 +113,128 @@ class DataDuplex:
 
     def generate_initial_bars(self):
         """Generate initial barcode"""
+        rng = self.random
         for i in range(self.num_bars):
-            bar = {
-                "height": random.randint(50, 450),
-                "base_height": random.randint(50, 450),
-                "noise_offset": random.uniform(0, 1),
-                "update_timer": random.randint(0, 20),
-                "stability": random.uniform(0.1, 0.9),  # Stability level
-                "data_type": random.choice(["binary", "analog", "corrupt"]),
-            }
-            self.bars.append(bar)
+            self.bar_height.append(rng.randint(50, 450))
+            self.bar_base_height.append(rng.randint(50, 450))
+            self.bar_stability.append(rng.uniform(0.1, 0.9))  # Stability level
+            self.bar_data_type[i] = rng.choice([BINARY, ANALOG, CORRUPT])
+
+            # First update fires once the initial timer runs out
+            self.bar_events.append((max(1, rng.randint(0, 20)) - 1, i))
+        heapq.heapify(self.bar_events)
 
     def generate_data_streams(self):
         """Generate data streams"""
+        rng = self.random
         for _ in range(self.max_streams):
-            stream = {
-                "y": random.randint(0, 512),
-                "speed": random.uniform(1, 8),
-                "width": random.randint(2, 16),
-                "pattern": [random.choice([0, 1]) for _ in range(32)],
-                "pattern_index": 0,
-                "lifetime": random.randint(60, 300),
-                "direction": random.choice([-1, 1]),
-            }
-            self.data_streams.append(stream)
+            if not self.free_stream_slots:
+                break
+
+            slot = self.free_stream_slots.pop()
+            width = rng.randint(2, 16)
+            pattern = [rng.choice([0, 1]) for _ in range(STREAM_BITS)]
+            self.render_stream_strip(slot, pattern, width)
+
+            self.stream_y0[slot] = rng.randint(0, 512)
+            self.stream_t0[slot] = self.time
+            speed = rng.uniform(1, 8)
+            self.stream_width[slot] = width
+            lifetime = rng.randint(60, 300)
+            self.stream_velocity[slot] = speed * rng.choice([-1, 1])
+            self.stream_slots.append(slot)
+            heapq.heappush(self.stream_events, (self.time + lifetime, slot))
+
+    def render_stream_strip(self, slot, pattern, width):
+        """Render a stream's bit pattern once into its strip slot"""
+        v = slot * STREAM_SLOT_HEIGHT
+        for i, bit in enumerate(pattern):
+            # 0 data is faint
+            color = 7 if bit == 1 else 1
+            self.stream_strips.rect(i * STREAM_BIT_WIDTH, v, STREAM_BIT_WIDTH, width, color)
+
+    def stream_y(self, slot):
+        """Stream position, wrapping around screen edges"""
+        width = self.stream_width[slot]
+        travelled = self.stream_velocity[slot] * (self.time - self.stream_t0[slot])
+        return (self.stream_y0[slot] + width + travelled) % (512 + width) - width
 
     def update_bars(self):
-        """Update barcode"""
-        for i, bar in enumerate(self.bars):
-            bar["update_timer"] -= 1
-
-            if bar["update_timer"] <= 0:
-                # Update according to data type
-                if bar["data_type"] == "binary":
-                    # Binary: sudden changes
-                    if random.random() < 0.1:
-                        bar["height"] = random.choice([50, 200, 350, 450])
-                        # Binary sound
-                        if random.random() < 0.3:
-                            pyxel.play(0, random.choice([0, 1]), loop=False)
-
-                elif bar["data_type"] == "analog":
-                    # Analog: smooth changes
-                    target = bar["base_height"] + random.randint(-100, 100)
-                    bar["height"] += (target - bar["height"]) * 0.1
-                    bar["height"] = max(20, min(480, bar["height"]))
-
-                elif bar["data_type"] == "corrupt":
-                    # Corrupted: random violent changes
-                    if random.random() < 0.2:
-                        bar["height"] = random.randint(10, 500)
-                        # Glitch sound
-                        if random.random() < 0.5:
-                            pyxel.play(1, 2, loop=False)
-
-                # Add noise
-                noise = random.uniform(-30, 30) * self.noise_intensity
-                bar["height"] += noise
-                bar["height"] = max(10, min(500, bar["height"]))
-
-                # Reset update interval
-                if bar["stability"] > 0.7:
-                    bar["update_timer"] = random.randint(10, 30)
-                elif bar["stability"] > 0.3:
-                    bar["update_timer"] = random.randint(3, 15)
-                else:
-                    bar["update_timer"] = random.randint(1, 5)
+        """Apply bar updates that are due this frame"""
+        rng = self.random
+        heights = self.bar_height
+        events = self.bar_events
+        while events and events[0][0] <= self.time:
+            _, i = heapq.heappop(events)
+            data_type = self.bar_data_type[i]
+
+            # Update according to data type
+            if data_type == BINARY:
+                # Binary: sudden changes
+                if rng.random() < 0.1:
+                    heights[i] = rng.choice([50, 200, 350, 450])
+                    # Binary sound
+                    if rng.random() < 0.3:
+                        pyxel.play(0, rng.choice([0, 1]), loop=False)
+
+            elif data_type == ANALOG:
+                # Analog: smooth changes
+                target = self.bar_base_height[i] + rng.randint(-100, 100)
+                heights[i] += (target - heights[i]) * 0.1
+                heights[i] = max(20, min(480, heights[i]))
+
+            elif data_type == CORRUPT:
+                # Corrupted: random violent changes
+                if rng.random() < 0.2:
+                    heights[i] = rng.randint(10, 500)
+                    # Glitch sound
+                    if rng.random() < 0.5:
+                        pyxel.play(1, 2, loop=False)
+
+            # Add noise
+            noise = rng.uniform(-30, 30) * self.noise_intensity
+            heights[i] = max(10, min(500, heights[i] + noise))
+
+            # Schedule next update by stability
+            stability = self.bar_stability[i]
+            if stability > 0.7:
+                interval = rng.randint(10, 30)
+            elif stability > 0.3:
+                interval = rng.randint(3, 15)
+            else:
+                interval = rng.randint(1, 5)
+            heapq.heappush(events, (self.time + interval, i))
 
     def update_data_streams(self):
-        """Update data streams"""
-        for stream in self.data_streams[:]:
-            stream["y"] += stream["speed"] * stream["direction"]
-            stream["lifetime"] -= 1
-
-            # Advance pattern
-            stream["pattern_index"] = (stream["pattern_index"] + 1) % len(
-                stream["pattern"]
-            )
-
-            # Wrap around screen edges
-            if stream["y"] > 512:
-                stream["y"] = -stream["width"]
-            elif stream["y"] < -stream["width"]:
-                stream["y"] = 512
-
-            # Remove when lifetime ends
-            if stream["lifetime"] <= 0:
-                self.data_streams.remove(stream)
+        """Expire finished streams and spawn new ones when due"""
+        events = self.stream_events
+        while events and events[0][0] <= self.time:
+            _, slot = heapq.heappop(events)
+            self.stream_slots.remove(slot)
+            self.free_stream_slots.append(slot)
 
         # Generate new streams
-        if len(self.data_streams) < self.max_streams and random.random() < 0.05:
-            self.generate_data_streams()
+        if self.time >= self.next_stream_spawn:
+            if len(self.stream_slots) < self.max_streams:
+                self.generate_data_streams()
+            self.next_stream_spawn = self.time + geometric_delay(self.random, 0.05)
 
     def generate_scan_line(self):
         """Generate scan lines"""
-        if random.random() < 0.1:
+        rng = self.random
+        if self.time >= self.next_scan_line:
+            self.next_scan_line = self.time + geometric_delay(rng, 0.1)
             scan = {
-                "y": random.randint(0, 512),
-                "speed": random.uniform(5, 20),
-                "width": random.randint(2, 8),
-                "lifetime": random.randint(20, 60),
-                "intensity": random.uniform(0.5, 1.0),
+                "y": rng.randint(0, 512),
+                "speed": rng.uniform(5, 20),
+                "width": rng.randint(2, 8),
+                "lifetime": rng.randint(20, 60),
+                "intensity": rng.uniform(0.5, 1.0),
             }
             self.scan_lines.append(scan)
 
             # Scan sound
-            if random.random() < 0.7:
+            if rng.random() < 0.7:
                 pyxel.play(2, 3, loop=False)
 
     def update_scan_lines(self):
@@ -165,12 +248,15 @@ class DataDuplex:
 
     def trigger_glitch(self):
         """Trigger glitch effect"""
-        if random.random() < self.glitch_probability:
+        rng = self.random
+        if self.time >= self.next_glitch:
+            self.next_glitch = self.time + geometric_delay(rng, self.glitch_probability)
+
             # Change multiple bars simultaneously
-            affected_bars = random.sample(self.bars, random.randint(5, 20))
-            for bar in affected_bars:
-                bar["height"] = random.randint(10, 500)
-                bar["data_type"] = "corrupt"
+            count = min(self.num_bars, rng.randint(5, 20))
+            for i in rng.sample(range(self.num_bars), count):
+                self.bar_height[i] = rng.randint(10, 500)
+                self.bar_data_type[i] = CORRUPT
 
             # Strong audio effect
             pyxel.play(0, 4, loop=False)
@@ -201,59 +287,78 @@ class DataDuplex:
         self.noise_intensity = max(0.1, self.noise_intensity)
 
         # High-speed data sound
-        if self.time % 15 == 0 and random.random() < 0.4:
+        if self.time % 15 == 0 and self.random.random() < 0.4:
             pyxel.play(1, 5, loop=False)
 
         # Background noise
-        if self.time % 120 == 0 and random.random() < 0.3:
+        if self.time % 120 == 0 and self.random.random() < 0.3:
             pyxel.play(2, 6, loop=False)
 
         self.time += 1
 
+        self.choose_frame_effects()
+
+    def choose_frame_effects(self):
+        """Pick the noise batch and line glitches for the next draw"""
+        rng = self.random
+        self.noise_batch = rng.randrange(NOISE_BATCHES)
+
+        self.line_glitches = []
+        if self.time >= self.next_line_glitch:
+            self.next_line_glitch = self.time + geometric_delay(
+                rng, self.glitch_probability * 0.5
+            )
+
+            # Horizontal line glitch
+            for _ in range(rng.randint(1, 5)):
+                y = rng.randint(0, 511)
+                width = rng.randint(50, 512)
+                x = rng.randint(0, 512 - width)
+                self.line_glitches.append((x, y, width, rng.choice([0, 7, 15])))
+
     def draw(self):
         # Black background
         pyxel.cls(0)
 
         # Draw barcode
-        for i, bar in enumerate(self.bars):
-            x = i * self.bar_width
-            height = int(bar["height"])
+        bar_width = self.bar_width
+        corrupt_blink = self.time % 4 < 2
+        for i, (bar_height, data_type) in enumerate(
+            zip(self.bar_height, self.bar_data_type)
+        ):
+            x = i * bar_width
+            height = int(bar_height)
 
             # Bar center position
             y_center = 256
             y_start = y_center - height // 2
             y_end = y_center + height // 2
 
-            # Draw bar (white)
-            pyxel.rect(x, y_start, self.bar_width, height, 7)
-
             # Effects according to data type
-            if bar["data_type"] == "corrupt":
+            if data_type == CORRUPT and corrupt_blink:
                 # Corrupted data blinks
-                if self.time % 4 < 2:
-                    pyxel.rect(x, y_start, self.bar_width, height, 8)
-
-            elif bar["data_type"] == "binary":
-                # Binary data has sharp boundaries
-                if height > 100:
-                    pyxel.rect(x, y_start, self.bar_width, 2, 15)
-                    pyxel.rect(x, y_end - 2, self.bar_width, 2, 15)
-
-        # Draw data streams
-        for stream in self.data_streams:
-            y = int(stream["y"])
-
-            # Draw according to pattern
-            for i, bit in enumerate(stream["pattern"]):
-                x = i * 16
-                if x > 512:
-                    break
-
-                if bit == 1:
-                    pyxel.rect(x, y, 16, stream["width"], 7)
-                else:
-                    # 0 data is faint
-                    pyxel.rect(x, y, 16, stream["width"], 1)
+                pyxel.rect(x, y_start, bar_width, height, 8)
+            else:
+                # Draw bar (white)
+                pyxel.rect(x, y_start, bar_width, height, 7)
+
+                if data_type == BINARY and height > 100:
+                    # Binary data has sharp boundaries
+                    pyxel.rect(x, y_start, bar_width, 2, 15)
+                    pyxel.rect(x, y_end - 2, bar_width, 2, 15)
+
+        # Draw data streams from their pre-rendered strips
+        strip_width = STREAM_BITS * STREAM_BIT_WIDTH
+        for slot in self.stream_slots:
+            pyxel.blt(
+                0,
+                int(self.stream_y(slot)),
+                self.stream_strips,
+                0,
+                slot * STREAM_SLOT_HEIGHT,
+                strip_width,
+                self.stream_width[slot],
+            )
 
         # Draw scan lines
         for scan in self.scan_lines:
@@ -266,22 +371,15 @@ class DataDuplex:
             if scan["width"] > 3:
                 pyxel.rect(0, y + 1, 512, 1, 7)
 
-        # Noise pixels
-        noise_count = int(100 * self.noise_intensity)
-        for _ in range(noise_count):
-            x = random.randint(0, 511)
-            y = random.randint(0, 511)
-            color = random.choice([0, 7, 15])
+        # Noise pixels from a pre-generated batch
+        noise_count = int(NOISE_BATCH_SIZE * self.noise_intensity)
+        batch = self.noise_batches[self.noise_batch]
+        for x, y, color in batch[:noise_count]:
             pyxel.pset(x, y, color)
 
         # Glitch effect
-        if random.random() < self.glitch_probability * 0.5:
-            # Horizontal line glitch
-            for _ in range(random.randint(1, 5)):
-                y = random.randint(0, 511)
-                width = random.randint(50, 512)
-                x = random.randint(0, 512 - width)
-                pyxel.rect(x, y, width, 1, random.choice([0, 7, 15]))
+        for x, y, width, color in self.line_glitches:
+            pyxel.rect(x, y, width, 1, color)
 
         # Data frame border
         pyxel.rectb(0, 0, 512, 512, 1)
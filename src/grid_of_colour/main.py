@@ -6,12 +6,17 @@
 # version: 1.0
 
 import pyxel
+import heapq
 import math
 import random
+from array import array
+
+# Stage marker for empty grid positions
+EMPTY = 255
 
 
 class GridOfColour:
-    def __init__(self):
+    def __init__(self, grid_size=16):
         pyxel.init(512, 512, title="Grid of Colour")
 
         # Colorful sound definitions
@@ -24,14 +29,26 @@ class GridOfColour:
         pyxel.sounds[6].set("a3g3e3", "t", "321", "f", 35)  # Chord
 
         self.time = 0
-        self.grid_size = 16  # 16x16 grid
+        self.grid_size = grid_size  # 16x16 grid by default, 256x256 for large mode
         self.cell_size = 512 // self.grid_size
 
-        # Grid state management
-        self.grid = {}  # (x, y): cell_data
+        # Grid state management (flat arrays indexed by y * grid_size + x)
+        cell_count = self.grid_size * self.grid_size
+        self.cell_stage = bytearray([EMPTY]) * cell_count  # 0:vibrant ... 3:black
+        self.cell_color = bytearray(cell_count)
+        self.cell_original_color = bytearray(cell_count)
+        self.cell_birth_time = array("l", [0]) * cell_count
+        self.cell_max_age = array("l", [0]) * cell_count
+        self.live_count = 0
         self.center_x = self.grid_size // 2
         self.center_y = self.grid_size // 2
 
+        # Vibrant cells with at least one empty neighbor
+        self.frontier = set()
+
+        # Upcoming stage transitions: (time, index); each cell has exactly one
+        self.transitions = []
+
         # Color palette (vibrant colors)
         self.vibrant_colors = [8, 9, 10, 11, 12, 13, 14, 15]
 
@@ -40,6 +57,23 @@ class GridOfColour:
         self.growth_interval = 15  # Frame interval
         self.max_distance = 0
 
+        # Color pool rings scale with grid size
+        self.distance_scale = self.grid_size / 16
+
+        # Persistent canvas, redrawn only where cells changed
+        self.canvas = pyxel.Image(512, 512)
+        self.canvas.cls(0)
+        self.dirty = set()
+
+        # Breathing size per diagonal (x + y); large breaths spill into
+        # the right and lower neighbor tiles
+        self.diagonals = [[] for _ in range(2 * self.grid_size - 1)]
+        for index in range(cell_count):
+            x, y = index % self.grid_size, index // self.grid_size
+            self.diagonals[x + y].append(index)
+        self.breath_sizes = [self.cell_size] * len(self.diagonals)
+        self.cell_overflow = int(self.cell_size * 1.05) > self.cell_size
+
         # Generate initial center cell
         self.spawn_center_cell()
 
@@ -47,69 +81,126 @@ class GridOfColour:
 
     def spawn_center_cell(self):
         """Generate center cell"""
-        cell = {
-            "color": random.choice(self.vibrant_colors),
-            "age": 0,
-            "max_age": random.randint(400, 800),  # Time until fading
-            "birth_time": self.time,
-            "original_color": None,
-            "fade_stage": 0,  # 0:vibrant, 1:medium, 2:dark, 3:black
-        }
-        cell["original_color"] = cell["color"]
-        self.grid[(self.center_x, self.center_y)] = cell
+        index = self.center_y * self.grid_size + self.center_x
+        color = random.choice(self.vibrant_colors)
+        self.add_cell(index, color, random.randint(400, 800))  # Time until fading
 
         # Generation sound
         pyxel.play(0, 0, loop=False)
 
-    def get_neighbors(self, x, y):
-        """Get coordinates of adjacent cells"""
+    def add_cell(self, index, color, max_age):
+        """Place a cell and schedule its first stage transition"""
+        self.cell_stage[index] = 0
+        self.cell_color[index] = color
+        self.cell_original_color[index] = color
+        self.cell_birth_time[index] = self.time
+        self.cell_max_age[index] = max_age
+        self.live_count += 1
+        self.schedule_transition(index)
+        self.mark_dirty(index)
+
+        # New cell may close the frontier of its neighbors
+        stage = self.cell_stage
+        if self.has_empty_neighbor(index):
+            self.frontier.add(index)
+        for neighbor in self.get_neighbors(index):
+            if stage[neighbor] != EMPTY and not self.has_empty_neighbor(neighbor):
+                self.frontier.discard(neighbor)
+
+    def remove_cell(self, index):
+        """Clear a cell, reopening the frontier of vibrant neighbors"""
+        self.cell_stage[index] = EMPTY
+        self.cell_color[index] = 0
+        self.live_count -= 1
+        self.frontier.discard(index)
+        self.mark_dirty(index)
+
+        stage = self.cell_stage
+        for neighbor in self.get_neighbors(index):
+            if stage[neighbor] < 2:
+                self.frontier.add(neighbor)
+
+    def mark_dirty(self, index):
+        """Queue a cell tile, and any tiles it spills into, for redraw"""
+        self.dirty.add(index)
+        if self.cell_overflow:
+            size = self.grid_size
+            right = index % size + 1 < size
+            below = index + size < size * size
+            if right:
+                self.dirty.add(index + 1)
+            if below:
+                self.dirty.add(index + size)
+                if right:
+                    self.dirty.add(index + size + 1)
+
+    def schedule_transition(self, index):
+        """Push the time at which the cell reaches its next fade stage"""
+        # Age ratio thresholds for stages 1-3 and removal
+        threshold = (0.3, 0.6, 0.8, 1.2)[self.cell_stage[index]]
+        due = self.cell_birth_time[index] + math.floor(
+            self.cell_max_age[index] * threshold
+        )
+        heapq.heappush(self.transitions, (due, index))
+
+    def get_neighbors(self, index):
+        """Get indices of adjacent cells"""
+        size = self.grid_size
+        x = index % size
         neighbors = []
-        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.grid_size and 0 <= ny < self.grid_size:
-                neighbors.append((nx, ny))
+        if index + size < size * size:
+            neighbors.append(index + size)
+        if x + 1 < size:
+            neighbors.append(index + 1)
+        if index >= size:
+            neighbors.append(index - size)
+        if x > 0:
+            neighbors.append(index - 1)
         return neighbors
 
+    def has_empty_neighbor(self, index):
+        stage = self.cell_stage
+        for neighbor in self.get_neighbors(index):
+            if stage[neighbor] == EMPTY:
+                return True
+        return False
+
     def grow_grid(self):
         """Grow the grid"""
-        new_cells = []
-
-        # Generate new cells at adjacent positions of existing cells
-        for (x, y), cell in list(self.grid.items()):
-            if cell["fade_stage"] < 2:  # Only vibrant cells grow
-                neighbors = self.get_neighbors(x, y)
-                for nx, ny in neighbors:
-                    if (nx, ny) not in self.grid and random.random() < 0.3:
-                        # Color influence by distance from center
-                        distance = math.sqrt(
-                            (nx - self.center_x) ** 2 + (ny - self.center_y) ** 2
-                        )
-
-                        # Fine-tune color by distance from center
-                        if distance < 3:
-                            color_pool = self.vibrant_colors
-                        elif distance < 6:
-                            color_pool = [8, 10, 11, 12, 14]
-                        else:
-                            color_pool = [8, 10, 12]
-
-                        new_cell = {
-                            "color": random.choice(color_pool),
-                            "age": 0,
-                            "max_age": random.randint(300, 700),
-                            "birth_time": self.time,
-                            "original_color": None,
-                            "fade_stage": 0,
-                        }
-                        new_cell["original_color"] = new_cell["color"]
-                        new_cells.append(((nx, ny), new_cell))
-
-                        # Update distance
-                        self.max_distance = max(self.max_distance, distance)
+        new_cells = {}
+        stage = self.cell_stage
+        size = self.grid_size
+        scale = self.distance_scale
+
+        # Generate new cells next to vibrant frontier cells
+        for index in self.frontier:
+            for neighbor in self.get_neighbors(index):
+                if stage[neighbor] == EMPTY and random.random() < 0.3:
+                    # Color influence by distance from center
+                    nx, ny = neighbor % size, neighbor // size
+                    distance = math.sqrt(
+                        (nx - self.center_x) ** 2 + (ny - self.center_y) ** 2
+                    )
+
+                    # Fine-tune color by distance from center
+                    if distance < 3 * scale:
+                        color_pool = self.vibrant_colors
+                    elif distance < 6 * scale:
+                        color_pool = [8, 10, 11, 12, 14]
+                    else:
+                        color_pool = [8, 10, 12]
+
+                    new_cells[neighbor] = (
+                        random.choice(color_pool),
+                        random.randint(300, 700),
+                    )
+
+                    # Update distance
+                    self.max_distance = max(self.max_distance, distance)
 
         # Add new cells
-        for (x, y), cell in new_cells:
-            self.grid[(x, y)] = cell
+        for index, (color, max_age) in new_cells.items():
+            self.add_cell(index, color, max_age)
 
             # Growth sound (probabilistically)
             if random.random() < 0.1:
@@ -117,41 +208,37 @@ class GridOfColour:
                 pyxel.play(1, sound_id, loop=False)
 
     def update_cells(self):
-        """Update cell age and fading"""
-        for (x, y), cell in list(self.grid.items()):
-            cell["age"] += 1
-
-            # Calculate fading stage
-            age_ratio = cell["age"] / cell["max_age"]
-
-            if age_ratio > 0.8:
-                new_stage = 3  # Black
-                new_color = 0
-            elif age_ratio > 0.6:
-                new_stage = 2  # Dark
-                new_color = max(1, cell["original_color"] - 6)
-            elif age_ratio > 0.3:
-                new_stage = 1  # Medium
-                new_color = max(2, cell["original_color"] - 3)
-            else:
-                new_stage = 0  # Vibrant
-                new_color = cell["original_color"]
-
-            # Sound when stage changes
-            if new_stage > cell["fade_stage"]:
-                cell["fade_stage"] = new_stage
-                if new_stage == 3:  # When turning black
-                    if random.random() < 0.1:
-                        pyxel.play(2, 5, loop=False)
-                elif new_stage == 2:  # When turning dark
-                    if random.random() < 0.05:
-                        pyxel.play(3, 6, loop=False)
+        """Apply fade stage transitions that are due this frame"""
+        transitions = self.transitions
+        stage = self.cell_stage
+        while transitions and transitions[0][0] <= self.time:
+            _, index = heapq.heappop(transitions)
 
-            cell["color"] = new_color
+            new_stage = stage[index] + 1
 
             # Remove completely black cells
-            if cell["age"] > cell["max_age"] * 1.2:
-                del self.grid[(x, y)]
+            if new_stage == 4:
+                self.remove_cell(index)
+                continue
+
+            stage[index] = new_stage
+            original_color = self.cell_original_color[index]
+            if new_stage == 3:
+                self.cell_color[index] = 0  # Black
+                # Sound when turning black
+                if random.random() < 0.1:
+                    pyxel.play(2, 5, loop=False)
+            elif new_stage == 2:
+                self.cell_color[index] = max(1, original_color - 6)  # Dark
+                self.frontier.discard(index)  # Only vibrant cells grow
+                # Sound when turning dark
+                if random.random() < 0.05:
+                    pyxel.play(3, 6, loop=False)
+            else:
+                self.cell_color[index] = max(2, original_color - 3)  # Medium
+
+            self.schedule_transition(index)
+            self.mark_dirty(index)
 
     def update(self):
         if pyxel.btnp(pyxel.KEY_Q):
@@ -164,55 +251,101 @@ class GridOfColour:
             self.growth_timer = 0
 
             # Growth sound
-            if len(self.grid) % 10 == 0 and random.random() < 0.3:
+            if self.live_count % 10 == 0 and random.random() < 0.3:
                 pyxel.play(0, 4, loop=False)
 
         # Update cells
         self.update_cells()
 
         # Restart when grid becomes empty
-        if len(self.grid) == 0:
+        if self.live_count == 0:
             self.spawn_center_cell()
             self.max_distance = 0
 
         # Occasional chord
-        if self.time % 200 == 0 and len(self.grid) > 20:
+        if self.time % 200 == 0 and self.live_count > 20:
             if random.random() < 0.4:
                 pyxel.play(1, 6, loop=False)
 
         self.time += 1
 
-    def draw(self):
-        # Deep background
-        pyxel.cls(0)
-
-        # Draw grid
-        for (x, y), cell in self.grid.items():
-            # Cell position and size
-            px = x * self.cell_size
-            py = y * self.cell_size
-
+    def update_breath(self):
+        """Mark live cells on diagonals whose breathing size changed"""
+        stage = self.cell_stage
+        phase = self.time * 0.05
+        for diagonal, cells in enumerate(self.diagonals):
             # Slight breathing effect
-            age_ratio = min(1.0, cell["age"] / cell["max_age"])
-            breath = 1 + 0.05 * math.sin(self.time * 0.05 + x + y)
-            size = int(self.cell_size * breath)
-
-            # Draw cell
-            pyxel.rect(px, py, size, size, cell["color"])
-
-            # Border (thins as it fades)
-            if cell["fade_stage"] < 2:
-                border_color = 7
-            elif cell["fade_stage"] < 3:
-                border_color = 1
-            else:
-                border_color = 0
+            breath = 1 + 0.05 * math.sin(phase + diagonal)
+            size_px = int(self.cell_size * breath)
+            if size_px != self.breath_sizes[diagonal]:
+                self.breath_sizes[diagonal] = size_px
+                for index in cells:
+                    if stage[index] != EMPTY:
+                        self.mark_dirty(index)
+
+    def draw_cell(self, index):
+        """Draw one cell onto the canvas"""
+        size = self.grid_size
+        cell_size = self.cell_size
+        stage = self.cell_stage[index]
+
+        # Cell position and size
+        x, y = index % size, index // size
+        px = x * cell_size
+        py = y * cell_size
+        size_px = self.breath_sizes[x + y]
+
+        # Draw cell
+        self.canvas.rect(px, py, size_px, size_px, self.cell_color[index])
+
+        # Border (thins as it fades, omitted on tiny cells)
+        if stage < 2:
+            border_color = 7
+        elif stage < 3:
+            border_color = 1
+        else:
+            border_color = 0
+
+        if border_color > 0 and cell_size >= 4:
+            self.canvas.rectb(px, py, cell_size, cell_size, border_color)
+
+    def redraw_tile(self, index):
+        """Repaint one tile, including spill from upper and left neighbors"""
+        size = self.grid_size
+        cell_size = self.cell_size
+        stage = self.cell_stage
+        x, y = index % size, index // size
+        px = x * cell_size
+        py = y * cell_size
+
+        self.canvas.clip(px, py, cell_size, cell_size)
+        self.canvas.rect(px, py, cell_size, cell_size, 0)
+
+        # Same painter's order as a full row-major pass
+        if self.cell_overflow:
+            if y > 0:
+                if x > 0 and stage[index - size - 1] != EMPTY:
+                    self.draw_cell(index - size - 1)
+                if stage[index - size] != EMPTY:
+                    self.draw_cell(index - size)
+            if x > 0 and stage[index - 1] != EMPTY:
+                self.draw_cell(index - 1)
+        if stage[index] != EMPTY:
+            self.draw_cell(index)
+
+        self.canvas.clip()
+
+    def draw(self):
+        # Repaint only changed tiles of the persistent canvas
+        self.update_breath()
+        for index in self.dirty:
+            self.redraw_tile(index)
+        self.dirty.clear()
 
-            if border_color > 0:
-                pyxel.rectb(px, py, self.cell_size, self.cell_size, border_color)
+        pyxel.blt(0, 0, self.canvas, 0, 0, 512, 512)
 
         # Display center point (fine light)
-        if len(self.grid) > 0:
+        if self.live_count > 0:
             center_px = self.center_x * self.cell_size + self.cell_size // 2
             center_py = self.center_y * self.cell_size + self.cell_size // 2
 
@@ -225,7 +358,7 @@ class GridOfColour:
                 pyxel.circ(center_px, center_py, pulse_size, 7)
 
         # Growth ripple effect
-        if self.growth_timer < 5 and len(self.grid) > 1:
+        if self.growth_timer < 5 and self.live_count > 1:
             center_px = self.center_x * self.cell_size + self.cell_size // 2
             center_py = self.center_y * self.cell_size + self.cell_size // 2
 
@@ -9,33 +9,48 @@ Version: 1.0.0
 import pyxel
 import math
 import random
+from array import array
+
+LATTICE = 32  # Sprites and pellets snap to this grid
+COLLISION_DISTANCE = 16
+MAZE_SIZE = 384  # One maze tile; stress mode lays tiles side by side
+
+SPRITE_TYPES = ['pacman', 'ghost', 'invader']
+SPRITE_COLORS = [3, 5, 6, 8, 11, 12, 14]
+DIRECTIONS = ['left', 'right', 'up', 'down']
+
+# Sprite sheet layout (color 2 never appears in a sprite, so it keys out)
+SHEET_KEY = 2
+SPRITE_WIDTH = 16
+SPRITE_HEIGHT = 20
+SPRITE_ANCHOR_X = 8
+SPRITE_ANCHOR_Y = 10
+TRAIL_CELL = 12
+TRAIL_ANCHOR = 6
+TRAIL_SIZES = range(2, 8)  # int(8 * alpha) for visible trail steps
 
 class GhostSprite:
-    def __init__(self, x, y, sprite_type):
+    def __init__(self, x, y, sprite_type, limit=448, slot=0):
         self.x = x
         self.y = y
         self.base_x = x
         self.base_y = y
         self.sprite_type = sprite_type
         self.frame = 0
-        self.direction = random.choice(['left', 'right', 'up', 'down'])
+        self.direction = random.choice(DIRECTIONS)
         self.speed = random.uniform(0.3, 0.8)
         self.phase = random.uniform(0, math.pi * 2)
-        self.color = random.choice([3, 5, 6, 8, 11, 12, 14])
-        self.trail = []
-        self.max_trail = 8
+        self.color = random.choice(SPRITE_COLORS)
+        self.slot = slot  # Row in the shared trail buffer
         self.flicker_timer = 0
         self.power_mode = False
         self.power_timer = 0
+        self.limit = limit
         
     def update(self):
         self.frame += 0.1
         self.phase += 0.05
         
-        self.trail.append((self.x, self.y, self.color))
-        if len(self.trail) > self.max_trail:
-            self.trail.pop(0)
-            
         if self.flicker_timer > 0:
             self.flicker_timer -= 1
             
@@ -59,28 +74,28 @@ class GhostSprite:
             self.y += self.speed
             self.x = self.base_x + wave
             
-        grid_size = 32
+        grid_size = LATTICE
         self.x = ((self.x + 8) // grid_size) * grid_size
         self.y = ((self.y + 8) // grid_size) * grid_size
         
         if self.x < 64:
             self.x = 64
             self.turn()
-        elif self.x > 448:
-            self.x = 448
+        elif self.x > self.limit:
+            self.x = self.limit
             self.turn()
         if self.y < 64:
             self.y = 64
             self.turn()
-        elif self.y > 448:
-            self.y = 448
+        elif self.y > self.limit:
+            self.y = self.limit
             self.turn()
             
         if random.random() < 0.02:
             self.turn()
             
     def turn(self):
-        directions = ['left', 'right', 'up', 'down']
+        directions = list(DIRECTIONS)
         directions.remove(self.direction)
         self.direction = random.choice(directions)
         self.base_x = self.x
@@ -94,53 +109,151 @@ class GhostSprite:
         self.speed *= 2
         pyxel.play(1, 3)
         
-    def draw(self):
+    def draw(self, sheet, trails):
         if self.flicker_timer % 4 < 2:
             return
             
-        for i, (tx, ty, tc) in enumerate(self.trail):
-            alpha = i / len(self.trail)
-            if alpha > 0.3:
-                size = 8 * alpha
-                if self.sprite_type == 'pacman':
-                    mouth_angle = abs(math.sin(self.frame * 0.5)) * 40
-                    pyxel.circ(tx, ty, size/2, tc)
-                elif self.sprite_type == 'ghost':
-                    pyxel.rect(tx - size/2, ty - size/2, size, size * 0.8, tc)
-                    for j in range(3):
-                        x = tx - size/2 + j * size/3
-                        pyxel.rect(x, ty + size/2 - 2, size/3 - 1, 3, tc)
-                elif self.sprite_type == 'invader':
-                    pyxel.rect(tx - size/2, ty - size/2, size, size/2, tc)
-                    pyxel.pset(tx - 2, ty - size/4, 0)
-                    pyxel.pset(tx + 2, ty - size/4, 0)
+        trails.draw(self, sheet)
                     
         color = 7 if self.power_mode else self.color
-        if self.sprite_type == 'pacman':
-            pyxel.circ(self.x, self.y, 6, color)
-            if self.direction == 'right':
-                pyxel.tri(self.x, self.y, self.x + 6, self.y - 4, self.x + 6, self.y + 4, 0)
-            elif self.direction == 'left':
-                pyxel.tri(self.x, self.y, self.x - 6, self.y - 4, self.x - 6, self.y + 4, 0)
-            elif self.direction == 'up':
-                pyxel.tri(self.x, self.y, self.x - 4, self.y - 6, self.x + 4, self.y - 6, 0)
-            elif self.direction == 'down':
-                pyxel.tri(self.x, self.y, self.x - 4, self.y + 6, self.x + 4, self.y + 6, 0)
-        elif self.sprite_type == 'ghost':
-            pyxel.rect(self.x - 6, self.y - 6, 12, 10, color)
-            pyxel.circ(self.x, self.y - 3, 6, color)
-            for i in range(3):
-                x = self.x - 6 + i * 4
-                pyxel.rect(x, self.y + 4, 3, 3, color)
-            pyxel.pset(self.x - 3, self.y - 3, 0)
-            pyxel.pset(self.x + 3, self.y - 3, 0)
-        elif self.sprite_type == 'invader':
-            pyxel.rect(self.x - 5, self.y - 4, 10, 5, color)
-            pyxel.rect(self.x - 7, self.y - 2, 14, 3, color)
-            pyxel.pset(self.x - 2, self.y - 2, 0)
-            pyxel.pset(self.x + 2, self.y - 2, 0)
-            pyxel.pset(self.x - 5, self.y + 3, color)
-            pyxel.pset(self.x + 5, self.y + 3, color)
+        u, v = sheet.sprite_frame(self.sprite_type, self.direction, color)
+        pyxel.blt(self.x - SPRITE_ANCHOR_X, self.y - SPRITE_ANCHOR_Y, 0, u, v,
+                  SPRITE_WIDTH, SPRITE_HEIGHT, SHEET_KEY)
+
+def draw_sprite_shape(target, x, y, sprite_type, direction, color):
+    """Full-size sprite, drawn with primitives"""
+    if sprite_type == 'pacman':
+        target.circ(x, y, 6, color)
+        if direction == 'right':
+            target.tri(x, y, x + 6, y - 4, x + 6, y + 4, 0)
+        elif direction == 'left':
+            target.tri(x, y, x - 6, y - 4, x - 6, y + 4, 0)
+        elif direction == 'up':
+            target.tri(x, y, x - 4, y - 6, x + 4, y - 6, 0)
+        elif direction == 'down':
+            target.tri(x, y, x - 4, y + 6, x + 4, y + 6, 0)
+    elif sprite_type == 'ghost':
+        target.rect(x - 6, y - 6, 12, 10, color)
+        target.circ(x, y - 3, 6, color)
+        for i in range(3):
+            target.rect(x - 6 + i * 4, y + 4, 3, 3, color)
+        target.pset(x - 3, y - 3, 0)
+        target.pset(x + 3, y - 3, 0)
+    elif sprite_type == 'invader':
+        target.rect(x - 5, y - 4, 10, 5, color)
+        target.rect(x - 7, y - 2, 14, 3, color)
+        target.pset(x - 2, y - 2, 0)
+        target.pset(x + 2, y - 2, 0)
+        target.pset(x - 5, y + 3, color)
+        target.pset(x + 5, y + 3, color)
+        
+def draw_trail_shape(target, tx, ty, sprite_type, size, tc):
+    """Shrunken trail copy of a sprite, drawn with primitives"""
+    if sprite_type == 'pacman':
+        target.circ(tx, ty, size/2, tc)
+    elif sprite_type == 'ghost':
+        target.rect(tx - size/2, ty - size/2, size, size * 0.8, tc)
+        for j in range(3):
+            x = tx - size/2 + j * size/3
+            target.rect(x, ty + size/2 - 2, size/3 - 1, 3, tc)
+    elif sprite_type == 'invader':
+        target.rect(tx - size/2, ty - size/2, size, size/2, tc)
+        target.pset(tx - 2, ty - size/4, 0)
+        target.pset(tx + 2, ty - size/4, 0)
+
+class SpriteSheet:
+    """Every sprite and trail frame pre-rendered into image banks 0 and 1"""
+    def __init__(self):
+        # Bank 0: one row per shape (four pacman facings, ghost, invader),
+        # one column per color (power mode white last)
+        self.sprite_rows = {}
+        for row, direction in enumerate(DIRECTIONS):
+            self.sprite_rows[('pacman', direction)] = row
+            self.sprite_rows[('ghost', direction)] = 4
+            self.sprite_rows[('invader', direction)] = 5
+        self.sprite_columns = {color: i for i, color in enumerate(SPRITE_COLORS + [7])}
+        
+        bank = pyxel.images[0]
+        bank.cls(SHEET_KEY)
+        shapes = [('pacman', direction) for direction in DIRECTIONS]
+        shapes += [('ghost', 'left'), ('invader', 'left')]
+        for sprite_type, direction in shapes:
+            row = self.sprite_rows[(sprite_type, direction)]
+            for color, column in self.sprite_columns.items():
+                draw_sprite_shape(bank,
+                                  column * SPRITE_WIDTH + SPRITE_ANCHOR_X,
+                                  row * SPRITE_HEIGHT + SPRITE_ANCHOR_Y,
+                                  sprite_type, direction, color)
+                                  
+        # Bank 1: one row per shape and color, one column per trail size
+        self.trail_rows = {}
+        for sprite_type in SPRITE_TYPES:
+            for color in SPRITE_COLORS:
+                self.trail_rows[(sprite_type, color)] = len(self.trail_rows)
+                
+        bank = pyxel.images[1]
+        bank.cls(SHEET_KEY)
+        for (sprite_type, color), row in self.trail_rows.items():
+            for size in TRAIL_SIZES:
+                draw_trail_shape(bank,
+                                 (size - TRAIL_SIZES[0]) * TRAIL_CELL + TRAIL_ANCHOR,
+                                 row * TRAIL_CELL + TRAIL_ANCHOR,
+                                 sprite_type, size, color)
+                                 
+    def sprite_frame(self, sprite_type, direction, color):
+        return (self.sprite_columns[color] * SPRITE_WIDTH,
+                self.sprite_rows[(sprite_type, direction)] * SPRITE_HEIGHT)
+                
+    def trail_frame(self, sprite_type, color, size):
+        return ((size - TRAIL_SIZES[0]) * TRAIL_CELL,
+                self.trail_rows[(sprite_type, color)] * TRAIL_CELL)
+
+class TrailBuffer:
+    """Trails of all sprites in one ring buffer, one row per sprite slot"""
+    def __init__(self, slots, length):
+        self.length = length
+        self.head = 0  # Next column written, shared by every row
+        self.trail_x = array('f', [0.0]) * (slots * length)
+        self.trail_y = array('f', [0.0]) * (slots * length)
+        self.trail_color = array('B', [0]) * (slots * length)
+        self.filled = array('H', [0]) * slots
+        
+        # Visible steps (oldest first) and their trail size, per fill count
+        self.steps = [
+            [(i, int(8 * i / filled)) for i in range(filled) if i / filled > 0.3]
+            for filled in range(length + 1)
+        ]
+        
+    def clear(self, slot):
+        self.filled[slot] = 0
+        
+    def record(self, sprites):
+        """Append every sprite's current position to its trail"""
+        length = self.length
+        head = self.head
+        trail_x, trail_y, trail_color = self.trail_x, self.trail_y, self.trail_color
+        filled = self.filled
+        for sprite in sprites:
+            slot = sprite.slot
+            index = slot * length + head
+            trail_x[index] = sprite.x
+            trail_y[index] = sprite.y
+            trail_color[index] = sprite.color
+            if filled[slot] < length:
+                filled[slot] += 1
+        self.head = (head + 1) % length
+        
+    def draw(self, sprite, sheet):
+        length = self.length
+        row = sprite.slot * length
+        filled = self.filled[sprite.slot]
+        start = self.head - filled
+        trail_x, trail_y, trail_color = self.trail_x, self.trail_y, self.trail_color
+        for i, size in self.steps[filled]:
+            index = row + (start + i) % length
+            u, v = sheet.trail_frame(sprite.sprite_type, trail_color[index], size)
+            pyxel.blt(trail_x[index] - TRAIL_ANCHOR, trail_y[index] - TRAIL_ANCHOR, 1,
+                      u, v, TRAIL_CELL, TRAIL_CELL, SHEET_KEY)
 
 class PowerPellet:
     def __init__(self, x, y):
@@ -158,24 +271,37 @@ class PowerPellet:
             pyxel.circ(self.x, self.y, size, 10)
             
 class PhantomArcade:
-    def __init__(self):
+    def __init__(self, sprite_count=8, maze_tiles=1, trail_length=8):
         pyxel.init(512, 512, title="Phantom Arcade")
         pyxel.cls(0)
         
+        # Stress mode: maze_tiles x maze_tiles mazes, scrolled by the camera
+        self.maze_tiles = maze_tiles
+        self.arena_size = 128 + MAZE_SIZE * maze_tiles
+        self.limit = self.arena_size - 64
+        self.camera_x = 0
+        self.camera_y = 0
+        
         self.sprites = []
-        sprite_types = ['pacman', 'ghost', 'invader']
-        for _ in range(8):
-            x = random.randint(96, 416)
-            y = random.randint(96, 416)
-            sprite_type = random.choice(sprite_types)
-            self.sprites.append(GhostSprite(x, y, sprite_type))
+        for slot in range(sprite_count):
+            x, y = self.random_position()
+            sprite_type = random.choice(SPRITE_TYPES)
+            self.sprites.append(GhostSprite(x, y, sprite_type, self.limit, slot))
+        self.trails = TrailBuffer(sprite_count, trail_length)
             
         self.pellets = []
-        for _ in range(5):
-            x = random.randint(96, 416) // 32 * 32
-            y = random.randint(96, 416) // 32 * 32
-            self.pellets.append(PowerPellet(x, y))
+        for _ in range(5 * maze_tiles * maze_tiles):
+            x, y = self.random_position()
+            self.pellets.append(PowerPellet(x // 32 * 32, y // 32 * 32))
             
+        # Lattice cell -> sprites in it, rebuilt every frame
+        self.sprite_cells = {}
+        
+        # Pre-rendered sprites, and one maze tile re-rendered per fade level
+        self.sheet = SpriteSheet()
+        self.maze_layer = pyxel.Image(MAZE_SIZE, MAZE_SIZE)
+        self.maze_color = None
+        
         self.maze_fade = 1.0
         self.frame_count = 0
         self.glitch_timer = 0
@@ -230,38 +356,83 @@ class PhantomArcade:
             4
         )
         
+    def random_position(self):
+        """Random spawn point inside a random maze tile"""
+        offset_x = random.randrange(self.maze_tiles) * MAZE_SIZE
+        offset_y = random.randrange(self.maze_tiles) * MAZE_SIZE
+        return (
+            offset_x + random.randint(96, 416),
+            offset_y + random.randint(96, 416),
+        )
+        
+    def build_sprite_cells(self):
+        """Bucket sprites by lattice cell"""
+        cells = {}
+        for sprite in self.sprites:
+            key = (int(sprite.x // LATTICE), int(sprite.y // LATTICE))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [sprite]
+            else:
+                bucket.append(sprite)
+        self.sprite_cells = cells
+        
+    def sprites_near(self, x, y):
+        """Sprites closer than the collision distance to (x, y)"""
+        cells = self.sprite_cells
+        cell_x = int(x // LATTICE)
+        cell_y = int(y // LATTICE)
+        limit = COLLISION_DISTANCE * COLLISION_DISTANCE
+        for key_y in (cell_y - 1, cell_y, cell_y + 1):
+            for key_x in (cell_x - 1, cell_x, cell_x + 1):
+                for sprite in cells.get((key_x, key_y), ()):
+                    if (sprite.x - x)**2 + (sprite.y - y)**2 < limit:
+                        yield sprite
+                        
+    def colliding_pairs(self):
+        """Sprite pairs closer than the collision distance (each pair once)"""
+        cells = self.sprite_cells
+        limit = COLLISION_DISTANCE * COLLISION_DISTANCE
+        for (cell_x, cell_y), bucket in cells.items():
+            for i, s1 in enumerate(bucket):
+                for s2 in bucket[i+1:]:
+                    if (s1.x - s2.x)**2 + (s1.y - s2.y)**2 < limit:
+                        yield s1, s2
+            for key in ((cell_x + 1, cell_y - 1), (cell_x + 1, cell_y),
+                        (cell_x + 1, cell_y + 1), (cell_x, cell_y + 1)):
+                for s1 in bucket:
+                    for s2 in cells.get(key, ()):
+                        if (s1.x - s2.x)**2 + (s1.y - s2.y)**2 < limit:
+                            yield s1, s2
+                            
     def update(self):
         if pyxel.btnp(pyxel.KEY_Q):
             pyxel.quit()
             
         self.frame_count += 1
         
+        self.trails.record(self.sprites)
         for sprite in self.sprites:
             sprite.update()
+        self.build_sprite_cells()
             
         for pellet in self.pellets:
             pellet.update()
             if not pellet.collected:
-                for sprite in self.sprites:
-                    dist = math.sqrt((sprite.x - pellet.x)**2 + (sprite.y - pellet.y)**2)
-                    if dist < 16:
-                        pellet.collected = True
-                        sprite.activate_power()
+                for sprite in self.sprites_near(pellet.x, pellet.y):
+                    pellet.collected = True
+                    sprite.activate_power()
                         
         for pellet in [p for p in self.pellets if p.collected]:
             self.pellets.remove(pellet)
-            x = random.randint(96, 416) // 32 * 32
-            y = random.randint(96, 416) // 32 * 32
-            self.pellets.append(PowerPellet(x, y))
+            x, y = self.random_position()
+            self.pellets.append(PowerPellet(x // 32 * 32, y // 32 * 32))
             
-        for i, s1 in enumerate(self.sprites):
-            for s2 in self.sprites[i+1:]:
-                dist = math.sqrt((s1.x - s2.x)**2 + (s1.y - s2.y)**2)
-                if dist < 16:
-                    s1.turn()
-                    s2.turn()
-                    self.glitch_timer = 10
-                    pyxel.play(2, 4)
+        for s1, s2 in list(self.colliding_pairs()):
+            s1.turn()
+            s2.turn()
+            self.glitch_timer = 10
+            pyxel.play(2, 4)
                     
         if self.frame_count % 300 == 0:
             self.maze_fade = 0.2
@@ -275,45 +446,79 @@ class PhantomArcade:
         if random.random() < 0.005:
             dead_sprite = random.choice(self.sprites)
             self.sprites.remove(dead_sprite)
-            x = random.randint(96, 416)
-            y = random.randint(96, 416)
-            sprite_type = random.choice(['pacman', 'ghost', 'invader'])
-            self.sprites.append(GhostSprite(x, y, sprite_type))
+            x, y = self.random_position()
+            sprite_type = random.choice(SPRITE_TYPES)
+            self.sprites.append(
+                GhostSprite(x, y, sprite_type, self.limit, dead_sprite.slot))
+            self.trails.clear(dead_sprite.slot)
             pyxel.play(3, 2)
             
+        # Stress mode: drift the view across the enlarged maze
+        if self.maze_tiles > 1:
+            travel = self.arena_size - 512
+            self.camera_x = int(travel * (0.5 + 0.5 * math.sin(self.frame_count * 0.003)))
+            self.camera_y = int(travel * (0.5 + 0.5 * math.sin(self.frame_count * 0.0041)))
+            
     def draw_maze(self):
         color = int(self.maze_fade * 5) + 1
+        if color != self.maze_color:
+            self.render_maze_layer(color)
+        
+        # Only the maze tiles in view
+        first_x = max(0, (self.camera_x - 64) // MAZE_SIZE)
+        first_y = max(0, (self.camera_y - 64) // MAZE_SIZE)
+        for tile_y in range(first_y, min(self.maze_tiles, first_y + 3)):
+            for tile_x in range(first_x, min(self.maze_tiles, first_x + 3)):
+                pyxel.blt(64 + tile_x * MAZE_SIZE, 64 + tile_y * MAZE_SIZE,
+                          self.maze_layer, 0, 0, MAZE_SIZE, MAZE_SIZE)
+                
+    def render_maze_layer(self, color):
+        """Draw one maze tile into the layer (tile origin at 64, 64)"""
+        layer = self.maze_layer
+        layer.cls(0)
+        ox = oy = -64
         
-        pyxel.rectb(64, 64, 384, 384, color)
-        pyxel.rectb(96, 96, 320, 320, color)
+        layer.rectb(ox + 64, oy + 64, 384, 384, color)
+        layer.rectb(ox + 96, oy + 96, 320, 320, color)
         
         for i in range(3):
             for j in range(3):
                 if (i + j) % 2 == 0:
-                    x = 128 + i * 96
-                    y = 128 + j * 96
-                    pyxel.rectb(x, y, 64, 64, color)
+                    x = ox + 128 + i * 96
+                    y = oy + 128 + j * 96
+                    layer.rectb(x, y, 64, 64, color)
                     
         for i in range(5):
-            x = 96 + i * 80
-            pyxel.line(x, 96, x, 160, color)
-            pyxel.line(x, 352, x, 416, color)
+            x = ox + 96 + i * 80
+            layer.line(x, oy + 96, x, oy + 160, color)
+            layer.line(x, oy + 352, x, oy + 416, color)
             
         for i in range(5):
-            y = 96 + i * 80
-            pyxel.line(96, y, 160, y, color)
-            pyxel.line(352, y, 416, y, color)
+            y = oy + 96 + i * 80
+            layer.line(ox + 96, y, ox + 160, y, color)
+            layer.line(ox + 352, y, ox + 416, y, color)
+            
+        self.maze_color = color
+            
+    def in_view(self, x, y, margin=24):
+        return (self.camera_x - margin <= x < self.camera_x + 512 + margin and
+                self.camera_y - margin <= y < self.camera_y + 512 + margin)
             
     def draw(self):
         pyxel.cls(0)
+        pyxel.camera(self.camera_x, self.camera_y)
         
         self.draw_maze()
         
         for pellet in self.pellets:
-            pellet.draw()
+            if self.in_view(pellet.x, pellet.y):
+                pellet.draw()
             
         for sprite in self.sprites:
-            sprite.draw()
+            if self.in_view(sprite.x, sprite.y, 32):
+                sprite.draw(self.sheet, self.trails)
+                
+        pyxel.camera()
             
         if self.glitch_timer > 0:
             for _ in range(20):
@@ -11,8 +11,328 @@ import math
 import random
 
 
+# Star blink period in frames (the blink phase advances 0.01 rad per frame)
+STAR_BLINK_PERIOD = int(2 * math.pi / 0.01)
+
+# Gravity mode: bodies thrown past this distance from the center are
+# recaptured onto their original orbit (the outermost orbit is ~340)
+ESCAPE_RADIUS = 400
+
+
+class OrbitalBodies:
+    """Orbital body state held in parallel arrays, advanced in one step"""
+
+    def __init__(self, center_x, center_y):
+        self.center_x = center_x
+        self.center_y = center_y
+
+        self.orbit_radius = []
+        self.angle = []
+        self.angular_speed = []
+        self.size = []
+        self.color = []
+        self.layer = []
+        self.orbital_phase = []
+        self.vertical_amplitude = []
+        self.breathing = []
+        self.x = []
+        self.y = []
+
+        # Bodies drawn far to near (orbit radii never change)
+        self.draw_order = []
+
+    def __len__(self):
+        return len(self.angle)
+
+    def add(self, layer_idx, orbit_radius, angle, angular_speed, size, color, **extra):
+        """Add a body and return its index"""
+        self.orbit_radius.append(orbit_radius)
+        self.angle.append(angle)
+        self.angular_speed.append(angular_speed)
+        self.size.append(size)
+        self.color.append(color)
+        self.layer.append(layer_idx)
+        self.orbital_phase.append(extra.get("orbital_phase", 0))
+        self.vertical_amplitude.append(extra.get("vertical_oscillation", 0) * 20)
+        self.breathing.append(extra.get("breathing", 0))
+        self.x.append(0)
+        self.y.append(0)
+        return len(self.angle) - 1
+
+    def sort_draw_order(self):
+        """Fix the draw order by orbit radius (far to near)"""
+        radius = self.orbit_radius
+        self.draw_order = sorted(
+            range(len(radius)), key=lambda i: radius[i], reverse=True
+        )
+
+    def step(self):
+        """Advance all angles and positions"""
+        cos = math.cos
+        sin = math.sin
+        cx = self.center_x
+        cy = self.center_y
+
+        self.angle = angle = [a + s for a, s in zip(self.angle, self.angular_speed)]
+        self.x = [cx + r * cos(a) for r, a in zip(self.orbit_radius, angle)]
+
+        # Vertical oscillation (elliptical orbit effect)
+        self.y = [
+            cy + r * sin(a) + v * sin(a * 2 + p)
+            for r, a, v, p in zip(
+                self.orbit_radius, angle, self.vertical_amplitude, self.orbital_phase
+            )
+        ]
+
+    def start_gravity(self, central_mass, body_mass):
+        """Switch to free motion: circular velocities around the central mass"""
+        self.central_mass = central_mass
+        self.mass = [body_mass(s) for s in self.size]
+        self.vx = []
+        self.vy = []
+        for i, r in enumerate(self.orbit_radius):
+            a = self.angle[i]
+            self.x[i] = self.center_x + r * math.cos(a)
+            self.y[i] = self.center_y + r * math.sin(a)
+            speed = math.sqrt(central_mass / r)
+            self.vx.append(-speed * math.sin(a))
+            self.vy.append(speed * math.cos(a))
+        self.ax = None
+        self.ay = None
+
+    def recapture(self, escape_radius):
+        """Put bodies that flew past escape_radius back on their circular orbit"""
+        cx = self.center_x
+        cy = self.center_y
+        escape2 = escape_radius * escape_radius
+        recaptured = False
+        for i, (x, y) in enumerate(zip(self.x, self.y)):
+            dx = x - cx
+            dy = y - cy
+            if dx * dx + dy * dy > escape2:
+                # Same bearing, original orbit radius, circular velocity
+                a = math.atan2(dy, dx)
+                r = self.orbit_radius[i]
+                speed = math.sqrt(self.central_mass / r)
+                self.x[i] = cx + r * math.cos(a)
+                self.y[i] = cy + r * math.sin(a)
+                self.vx[i] = -speed * math.sin(a)
+                self.vy[i] = speed * math.cos(a)
+                recaptured = True
+
+        # Stored accelerations are stale for moved bodies
+        if recaptured:
+            self.ax = None
+            self.ay = None
+
+    def gravity_accelerations(self, tree):
+        """Mutual attraction via the tree plus the fixed central mass"""
+        tree.build(self.x, self.y, self.mass)
+        ax, ay = tree.accelerations(self.x, self.y, self.mass)
+
+        cx = self.center_x
+        cy = self.center_y
+        gm = self.central_mass
+        eps2 = tree.softening2
+        sqrt = math.sqrt
+        for i, (x, y) in enumerate(zip(self.x, self.y)):
+            dx = cx - x
+            dy = cy - y
+            d2 = dx * dx + dy * dy + eps2
+            f = gm / (d2 * sqrt(d2))
+            ax[i] += f * dx
+            ay[i] += f * dy
+        return ax, ay
+
+    def step_gravity(self, tree):
+        """Advance one frame with a kick-drift-kick leapfrog"""
+        if self.ax is None:
+            self.ax, self.ay = self.gravity_accelerations(tree)
+
+        # Half kick, drift
+        vx = [v + 0.5 * a for v, a in zip(self.vx, self.ax)]
+        vy = [v + 0.5 * a for v, a in zip(self.vy, self.ay)]
+        self.x = [x + v for x, v in zip(self.x, vx)]
+        self.y = [y + v for y, v in zip(self.y, vy)]
+
+        # Half kick with the new accelerations
+        self.ax, self.ay = self.gravity_accelerations(tree)
+        self.vx = [v + 0.5 * a for v, a in zip(vx, self.ax)]
+        self.vy = [v + 0.5 * a for v, a in zip(vy, self.ay)]
+
+    def draw_sizes(self, time):
+        """Breathing sizes for the current frame"""
+        sin = math.sin
+        phase = time * 0.05
+        return [
+            int(s * (1 + b * sin(phase + a)))
+            for s, b, a in zip(self.size, self.breathing, self.angle)
+        ]
+
+
+class BarnesHutTree:
+    """Quadtree of body masses for O(n log n) mutual gravity"""
+
+    def __init__(self, theta=0.7, softening=4, leaf_size=4, encounter_radius=40):
+        self.theta2 = theta * theta
+        self.softening2 = softening * softening
+        self.leaf_size = leaf_size
+        self.encounter_radius2 = encounter_radius * encounter_radius
+
+        # Flat node arrays
+        self.node_size2 = []
+        self.node_mass = []
+        self.node_x = []
+        self.node_y = []
+        self.node_children = []
+        self.node_bodies = []
+
+        # Close body pairs met at leaf level during the last traversal
+        self.encounters = []
+
+    def build(self, xs, ys, masses):
+        """Rebuild the tree over all bodies"""
+        self.node_size2 = []
+        self.node_mass = []
+        self.node_x = []
+        self.node_y = []
+        self.node_children = []
+        self.node_bodies = []
+
+        if not xs:
+            return
+
+        min_x, max_x = min(xs), max(xs)
+        min_y, max_y = min(ys), max(ys)
+        half = max(max_x - min_x, max_y - min_y) / 2 + 1
+        self._build_node(
+            list(range(len(xs))),
+            (min_x + max_x) / 2,
+            (min_y + max_y) / 2,
+            half,
+            xs,
+            ys,
+            masses,
+        )
+
+    def _build_node(self, indices, cx, cy, half, xs, ys, masses):
+        node = len(self.node_mass)
+        self.node_size2.append(4 * half * half)
+        self.node_mass.append(0)
+        self.node_x.append(0)
+        self.node_y.append(0)
+        self.node_children.append(())
+        self.node_bodies.append(())
+
+        if len(indices) <= self.leaf_size or half < 0.5:
+            # Leaf bucket
+            mass = mx = my = 0
+            for i in indices:
+                m = masses[i]
+                mass += m
+                mx += m * xs[i]
+                my += m * ys[i]
+            self.node_bodies[node] = indices
+        else:
+            quadrants = ([], [], [], [])
+            for i in indices:
+                quadrants[(xs[i] >= cx) + 2 * (ys[i] >= cy)].append(i)
+
+            quarter = half / 2
+            children = []
+            mass = mx = my = 0
+            for q, members in enumerate(quadrants):
+                if not members:
+                    continue
+                child = self._build_node(
+                    members,
+                    cx + (quarter if q & 1 else -quarter),
+                    cy + (quarter if q & 2 else -quarter),
+                    quarter,
+                    xs,
+                    ys,
+                    masses,
+                )
+                m = self.node_mass[child]
+                mass += m
+                mx += m * self.node_x[child]
+                my += m * self.node_y[child]
+                children.append(child)
+            self.node_children[node] = children
+
+        self.node_mass[node] = mass
+        if mass > 0:
+            self.node_x[node] = mx / mass
+            self.node_y[node] = my / mass
+        else:
+            self.node_x[node] = cx
+            self.node_y[node] = cy
+        return node
+
+    def accelerations(self, xs, ys, masses):
+        """Gravitational acceleration on every body, recording close encounters"""
+        theta2 = self.theta2
+        eps2 = self.softening2
+        encounter2 = self.encounter_radius2
+        size2 = self.node_size2
+        node_mass = self.node_mass
+        node_x = self.node_x
+        node_y = self.node_y
+        node_children = self.node_children
+        node_bodies = self.node_bodies
+        sqrt = math.sqrt
+
+        encounters = []
+        ax = [0.0] * len(xs)
+        ay = [0.0] * len(xs)
+        if not node_mass:
+            self.encounters = encounters
+            return ax, ay
+
+        for i in range(len(xs)):
+            x = xs[i]
+            y = ys[i]
+            fx = fy = 0.0
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                bodies = node_bodies[node]
+                if bodies:
+                    # Direct sum inside a leaf bucket
+                    for j in bodies:
+                        if j == i:
+                            continue
+                        dx = xs[j] - x
+                        dy = ys[j] - y
+                        d2 = dx * dx + dy * dy
+                        if d2 < encounter2 and j > i:
+                            encounters.append((i, j))
+                        d2 += eps2
+                        f = masses[j] / (d2 * sqrt(d2))
+                        fx += f * dx
+                        fy += f * dy
+                    continue
+
+                dx = node_x[node] - x
+                dy = node_y[node] - y
+                d2 = dx * dx + dy * dy
+                if size2[node] < theta2 * d2:
+                    # Far enough: treat node as a single mass
+                    d2 += eps2
+                    f = node_mass[node] / (d2 * sqrt(d2))
+                    fx += f * dx
+                    fy += f * dy
+                else:
+                    stack.extend(node_children[node])
+            ax[i] = fx
+            ay[i] = fy
+
+        self.encounters = encounters
+        return ax, ay
+
+
 class PlanetsOfReflection:
-    def __init__(self):
+    def __init__(self, asteroids=0, gravity=False):
         pyxel.init(512, 512, title="Planets of Reflection")
 
         # Cosmic sound definitions
@@ -24,9 +344,12 @@ class PlanetsOfReflection:
         pyxel.sounds[5].set("g1c2e2g2", "t", "7642", "f", 100)  # Space sound
 
         self.time = 0
-        self.planets = []
         self.orbital_center_x = 256
         self.orbital_center_y = 256
+        self.bodies = OrbitalBodies(self.orbital_center_x, self.orbital_center_y)
+
+        # Sounding planets: body index -> sound state
+        self.planets = []
 
         # Planet color palette (single flat colors)
         self.planet_colors = [8, 9, 10, 11, 12, 13, 14, 15, 6, 7]
@@ -41,64 +364,136 @@ class PlanetsOfReflection:
             {"radius": 330, "max_planets": 8, "size_range": (6, 15)},
         ]
 
+        # Optional asteroid belt (thousands of small silent bodies)
+        if asteroids > 0:
+            self.orbital_layers.append(
+                {
+                    "radius": 205,
+                    "max_planets": asteroids,
+                    "size_range": (0, 1),
+                    "spread": 14,
+                    "colors": [5, 6, 13],
+                    "belt": True,
+                }
+            )
+
         # Generate initial planets
         self.generate_planets()
 
+        # Optional mutual-gravity mode (pure Python: about 500 bodies keep real time)
+        self.gravity = gravity
+        if gravity:
+            self.tree = BarnesHutTree()
+            self.bodies.start_gravity(100, lambda size: 0.0005 * size * size + 0.0001)
+
+        # Static background layers
+        self.generate_background_stars()
+        self.generate_orbital_paths()
+
         pyxel.run(self.update, self.draw)
 
     def generate_planets(self):
         """Generate planets"""
         for layer_idx, layer in enumerate(self.orbital_layers):
+            if layer.get("belt"):
+                self.generate_belt(layer_idx, layer)
+                continue
+
             for i in range(layer["max_planets"]):
                 angle = (i / layer["max_planets"]) * 2 * math.pi + random.uniform(
                     0, 0.5
                 )
 
+                index = self.bodies.add(
+                    layer_idx,
+                    layer["radius"] + random.uniform(-10, 10),
+                    angle,
+                    random.uniform(0.005, 0.02) / (layer_idx + 1),
+                    random.randint(*layer["size_range"]),
+                    random.choice(self.planet_colors),
+                    orbital_phase=random.uniform(0, 2 * math.pi),
+                    vertical_oscillation=random.uniform(0.2, 0.8),
+                    breathing=random.uniform(0.02, 0.05),
+                )
+
                 planet = {
-                    "orbit_radius": layer["radius"] + random.uniform(-10, 10),
-                    "angle": angle,
-                    "angular_speed": random.uniform(0.005, 0.02) / (layer_idx + 1),
-                    "size": random.randint(*layer["size_range"]),
-                    "color": random.choice(self.planet_colors),
-                    "rotation": 0,
-                    "rotation_speed": random.uniform(-0.1, 0.1),
-                    "layer": layer_idx,
+                    "index": index,
                     "sound_timer": random.randint(0, 200),
                     "sound_interval": random.randint(300, 600),
-                    "orbital_phase": random.uniform(0, 2 * math.pi),
-                    "vertical_oscillation": random.uniform(0.2, 0.8),
-                    "breathing": random.uniform(0.02, 0.05),
                 }
 
                 self.planets.append(planet)
 
-    def update_planets(self):
-        """Update planet positions and states"""
-        for planet in self.planets:
-            # Orbital motion
-            planet["angle"] += planet["angular_speed"]
+        self.bodies.sort_draw_order()
+
+    def generate_belt(self, layer_idx, layer):
+        """Generate a belt of small silent bodies"""
+        spread = layer["spread"]
+        for _ in range(layer["max_planets"]):
+            self.bodies.add(
+                layer_idx,
+                layer["radius"] + random.uniform(-spread, spread),
+                random.uniform(0, 2 * math.pi),
+                random.uniform(0.002, 0.006),
+                random.randint(*layer["size_range"]),
+                random.choice(layer["colors"]),
+                orbital_phase=random.uniform(0, 2 * math.pi),
+                vertical_oscillation=random.uniform(0.2, 0.8),
+            )
 
-            # Rotation
-            planet["rotation"] += planet["rotation_speed"]
+    def generate_background_stars(self):
+        """Generate fixed constellation and its blink table"""
+        # Private generator keeps the global RNG untouched
+        star_random = random.Random(42)
 
-            # Calculate orbital position
-            base_x = self.orbital_center_x + planet["orbit_radius"] * math.cos(
-                planet["angle"]
-            )
-            base_y = self.orbital_center_y + planet["orbit_radius"] * math.sin(
-                planet["angle"]
-            )
+        self.stars = []
+        for _ in range(50):
+            x = star_random.randint(0, 511)
+            y = star_random.randint(0, 511)
+            # Blink phase offset in frames
+            self.stars.append((x, y, x + y))
+
+        # Star size per blink step (-1 = hidden)
+        self.star_blink_table = []
+        for step in range(STAR_BLINK_PERIOD):
+            brightness = 0.5 + 0.5 * math.sin(step * 0.01)
+            if brightness > 0.9:
+                self.star_blink_table.append(1)
+            elif brightness > 0.7:
+                self.star_blink_table.append(0)
+            else:
+                self.star_blink_table.append(-1)
 
-            # Vertical oscillation (elliptical orbit effect)
-            vertical_offset = (
-                planet["vertical_oscillation"]
-                * 20
-                * math.sin(planet["angle"] * 2 + planet["orbital_phase"])
-            )
+    def generate_orbital_paths(self):
+        """Generate orbital path points"""
+        self.orbital_path_points = []
+        for layer in self.orbital_layers:
+            if layer.get("belt"):
+                continue
+            radius = layer["radius"]
+
+            # Orbital ellipse
+            for angle in range(0, 360, 5):
+                rad = math.radians(angle)
+                x = self.orbital_center_x + radius * math.cos(rad)
+                y = self.orbital_center_y + radius * math.sin(rad)
+
+                # Orbit considering vertical oscillation
+                vertical_offset = 20 * 0.5 * math.sin(rad * 2)
+                y += vertical_offset
 
-            planet["x"] = base_x
-            planet["y"] = base_y + vertical_offset
+                if 0 <= x < 512 and 0 <= y < 512:
+                    self.orbital_path_points.append((int(x), int(y)))
 
+    def update_planets(self):
+        """Update planet positions and states"""
+        if self.gravity:
+            self.bodies.step_gravity(self.tree)
+            self.bodies.recapture(ESCAPE_RADIUS)
+        else:
+            self.bodies.step()
+
+        for planet in self.planets:
             # Sound timer
             planet["sound_timer"] += 1
             if planet["sound_timer"] >= planet["sound_interval"]:
@@ -109,9 +504,10 @@ class PlanetsOfReflection:
     def play_planet_sound(self, planet):
         """Play sound according to planet size"""
         if random.random() < 0.6:  # Increase probability
-            if planet["size"] > 30:
+            size = self.bodies.size[planet["index"]]
+            if size > 30:
                 pyxel.play(0, 0, loop=False)  # Large planet
-            elif planet["size"] > 20:
+            elif size > 20:
                 pyxel.play(1, 1, loop=False)  # Medium planet
             else:
                 pyxel.play(2, 2, loop=False)  # Small planet
@@ -119,18 +515,35 @@ class PlanetsOfReflection:
     def check_orbital_resonance(self):
         """Check orbital resonance"""
         if self.time % 180 == 0:  # Periodic check
+            if self.gravity:
+                self.check_gravity_resonance()
+                return
+
+            radius = self.bodies.orbit_radius
+            angle = self.bodies.angle
+
             # Check angle difference between nearby orbit planets
             for i, p1 in enumerate(self.planets):
+                i1 = p1["index"]
                 for p2 in self.planets[i + 1 :]:
-                    orbit_diff = abs(p1["orbit_radius"] - p2["orbit_radius"])
+                    i2 = p2["index"]
+                    orbit_diff = abs(radius[i1] - radius[i2])
                     if orbit_diff < 30:  # Nearby orbit
-                        angle_diff = abs(p1["angle"] - p2["angle"]) % (2 * math.pi)
+                        angle_diff = abs(angle[i1] - angle[i2]) % (2 * math.pi)
                         if (
                             angle_diff < 0.3 or angle_diff > 2 * math.pi - 0.3
                         ):  # Close angle
                             if random.random() < 0.4:
                                 pyxel.play(1, 3, loop=False)  # Resonance sound
 
+    def check_gravity_resonance(self):
+        """Resonance from close planet pairs found during the tree traversal"""
+        voiced = {planet["index"] for planet in self.planets}
+        for i, j in self.tree.encounters:
+            if i in voiced and j in voiced:
+                if random.random() < 0.4:
+                    pyxel.play(1, 3, loop=False)  # Resonance sound
+
     def update(self):
         if pyxel.btnp(pyxel.KEY_Q):
             pyxel.quit()
@@ -151,61 +564,40 @@ class PlanetsOfReflection:
 
         self.time += 1
 
-    def draw_planet(self, planet):
-        """Draw planet (simple flat color)"""
-        x, y = int(planet["x"]), int(planet["y"])
-        base_size = planet["size"]
+    def draw_planets(self):
+        """Draw planets (simple flat color)"""
+        bodies = self.bodies
+        xs = bodies.x
+        ys = bodies.y
+        colors = bodies.color
 
         # Breathing effect
-        breathing = 1 + planet["breathing"] * math.sin(
-            self.time * 0.05 + planet["angle"]
-        )
-        size = int(base_size * breathing)
+        sizes = bodies.draw_sizes(self.time)
 
-        # Draw planet with flat color
-        pyxel.circ(x, y, size, planet["color"])
+        # Draw planets with flat color
+        for i in bodies.draw_order:
+            size = sizes[i]
+            if size > 0:
+                pyxel.circ(int(xs[i]), int(ys[i]), size, colors[i])
+            else:
+                pyxel.pset(int(xs[i]), int(ys[i]), colors[i])
 
     def draw_orbital_paths(self):
         """Draw orbital paths"""
-        for layer in self.orbital_layers:
-            radius = layer["radius"]
-
-            # Orbital ellipse
-            for angle in range(0, 360, 5):
-                rad = math.radians(angle)
-                x = self.orbital_center_x + radius * math.cos(rad)
-                y = self.orbital_center_y + radius * math.sin(rad)
-
-                # Orbit considering vertical oscillation
-                vertical_offset = 20 * 0.5 * math.sin(rad * 2)
-                y += vertical_offset
-
-                if 0 <= x < 512 and 0 <= y < 512:
-                    # Faint orbital line
-                    if self.time % 120 < 60:  # Blinking
-                        pyxel.pset(int(x), int(y), 1)
+        if self.time % 120 < 60:  # Blinking
+            for x, y in self.orbital_path_points:
+                # Faint orbital line
+                pyxel.pset(x, y, 1)
 
     def draw_background_stars(self):
         """Draw background stars"""
-        # Fixed constellation pattern
-        star_seed = 42
-        random.seed(star_seed)
-
-        for _ in range(50):
-            x = random.randint(0, 511)
-            y = random.randint(0, 511)
-
+        table = self.star_blink_table
+        for x, y, offset in self.stars:
             # Star blinking
-            brightness_phase = (self.time * 0.01 + x * 0.01 + y * 0.01) % (2 * math.pi)
-            brightness = 0.5 + 0.5 * math.sin(brightness_phase)
-
-            if brightness > 0.7:
-                size = 1 if brightness > 0.9 else 0
+            size = table[(self.time + offset) % STAR_BLINK_PERIOD]
+            if size >= 0:
                 pyxel.circ(x, y, size, 7)
 
-        # Reset random seed
-        random.seed()
-
     def draw(self):
         # Deep space background
         pyxel.cls(1)
@@ -217,12 +609,7 @@ class PlanetsOfReflection:
         self.draw_orbital_paths()
 
         # Draw planets in size order (far to near)
-        sorted_planets = sorted(
-            self.planets, key=lambda p: p["orbit_radius"], reverse=True
-        )
-
-        for planet in sorted_planets:
-            self.draw_planet(planet)
+        self.draw_planets()
 
 
 PlanetsOfReflection()
@@ -11,15 +11,26 @@ import pyxel
 import math
 import random
 
+STAMP_VARIANTS = 4  # Dither patterns per glow disc, picked at random each frame
+STAMP_KEY = 1  # Discs draw black pixels, so another color keys them out
+BRIGHTNESS_STEP = 0.05  # Brightness quantization for cached glow discs
+DOT_FIELD_VARIANTS = 6  # Pre-generated ambient dot fields per density level
+DOT_FIELD_LEVELS = 6  # Density steps up to 30% of the lattice at full dusk
+AMBIENT_MAX = 0.2  # Peak of ambient_brightness
+
 class PulseOfDusk:
-    def __init__(self):
+    def __init__(self, fireflies=50):
         pyxel.init(512, 512, title="Pulse of Dusk")
         
         self.time = 0
         self.particles = []
         self.ambient_brightness = 0
         
-        for _ in range(50):
+        # Glow discs and ambient dot fields, rendered the first time each level is drawn
+        self.glow_stamps = {}
+        self.dot_fields = {}
+        
+        for _ in range(fireflies):
             self.particles.append({
                 'x': random.randint(0, 512),
                 'y': random.randint(0, 512),
@@ -48,41 +59,78 @@ class PulseOfDusk:
                 particle['x'] = random.randint(0, 512)
                 particle['y'] = random.randint(0, 512)
 
+    def get_glow_stamps(self, size, glow_size, level):
+        """Pre-dithered glow discs for one size, glow radius and brightness level"""
+        key = (size, glow_size, level)
+        stamps = self.glow_stamps.get(key)
+        if stamps is None:
+            brightness = level * BRIGHTNESS_STEP
+            intensity = int(brightness * 4)
+            color = [0, 5, 6, 7, 15][min(intensity, 4)]
+            width = 2 * glow_size + 1
+            stamps = []
+            for _ in range(STAMP_VARIANTS):
+                stamp = pyxel.Image(width, width)
+                stamp.cls(STAMP_KEY)
+                for dx in range(-glow_size, glow_size + 1):
+                    for dy in range(-glow_size, glow_size + 1):
+                        distance = math.sqrt(dx*dx + dy*dy)
+                        px = dx + glow_size
+                        py = dy + glow_size
+                        if distance <= size:
+                            stamp.pset(px, py, color)
+                        elif distance <= glow_size:
+                            glow_intensity = 1 - (distance - size) / (glow_size - size)
+                            if random.random() < glow_intensity * brightness:
+                                glow_color = [0, 5, 6][min(int(glow_intensity * 2), 2)]
+                                stamp.pset(px, py, glow_color)
+                stamps.append(stamp)
+            self.glow_stamps[key] = stamps
+        return stamps
+
+    def get_dot_fields(self, level):
+        """Pre-generated ambient dot fields for one density level"""
+        fields = self.dot_fields.get(level)
+        if fields is None:
+            density = 0.3 * level / DOT_FIELD_LEVELS
+            fields = []
+            for _ in range(DOT_FIELD_VARIANTS):
+                field = pyxel.Image(512, 512)
+                field.cls(0)
+                for y in range(0, 512, 4):
+                    for x in range(0, 512, 4):
+                        if random.random() < density:
+                            field.pset(x, y, 5)
+                fields.append(field)
+            self.dot_fields[level] = fields
+        return fields
+
     def draw(self):
         base_color = int(self.ambient_brightness * 255)
         pyxel.cls(0)
         
         if base_color > 0:
-            for y in range(0, 512, 4):
-                for x in range(0, 512, 4):
-                    if random.random() < 0.3:
-                        pyxel.pset(x, y, 5)
+            # Denser dots as dusk brightens, one random field per frame
+            level = max(1, round(self.ambient_brightness / AMBIENT_MAX * DOT_FIELD_LEVELS))
+            fields = self.get_dot_fields(level)
+            field = fields[int(random.random() * DOT_FIELD_VARIANTS)]
+            pyxel.blt(0, 0, field, 0, 0, 512, 512)
         
         for particle in self.particles:
             if particle['brightness'] > 0.05:
-                intensity = int(particle['brightness'] * 4)
-                color = [0, 5, 6, 7, 15][min(intensity, 4)]
+                level = round(particle['brightness'] / BRIGHTNESS_STEP)
+                brightness = level * BRIGHTNESS_STEP
                 
-                size = int(particle['brightness'] * particle['size'])
-                glow_size = int(particle['brightness'] * particle['glow_radius'])
+                size = int(brightness * particle['size'])
+                glow_size = int(brightness * particle['glow_radius'])
                 
                 center_x = int(particle['x'])
                 center_y = int(particle['y'])
                 
-                for dx in range(-glow_size, glow_size + 1):
-                    for dy in range(-glow_size, glow_size + 1):
-                        distance = math.sqrt(dx*dx + dy*dy)
-                        px = center_x + dx
-                        py = center_y + dy
-                        
-                        if 0 <= px < 512 and 0 <= py < 512:
-                            if distance <= size:
-                                pyxel.pset(px, py, color)
-                            elif distance <= glow_size:
-                                glow_intensity = 1 - (distance - size) / (glow_size - size)
-                                if random.random() < glow_intensity * particle['brightness']:
-                                    glow_color = [0, 5, 6][min(int(glow_intensity * 2), 2)]
-                                    pyxel.pset(px, py, glow_color)
+                stamps = self.get_glow_stamps(size, glow_size, level)
+                stamp = stamps[int(random.random() * STAMP_VARIANTS)]
+                pyxel.blt(center_x - glow_size, center_y - glow_size,
+                          stamp, 0, 0, stamp.width, stamp.height, STAMP_KEY)
                 
                 if particle['brightness'] > 0.8:
                     for _ in range(int(particle['brightness'] * 10)):
@@ -92,4 +140,4 @@ class PulseOfDusk:
                             pyxel.pset(spark_x, spark_y, 15)
 
 if __name__ == "__main__":
-    PulseOfDusk()
\ No newline at end of file
+    PulseOfDusk()
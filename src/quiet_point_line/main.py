@@ -8,6 +8,62 @@
 import pyxel
 import math
 import random
+from array import array
+
+
+def simplify_path(path, tolerance=0.75):
+    """Ramer-Douglas-Peucker simplification of a flat (x, y, x, y, ...) path"""
+    count = len(path) // 2
+    if count < 3:
+        return array("h", path)
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = path[2 * first], path[2 * first + 1]
+        x2, y2 = path[2 * last], path[2 * last + 1]
+        dx = x2 - x1
+        dy = y2 - y1
+        length = math.hypot(dx, dy)
+
+        max_dist = 0
+        max_index = first
+        for i in range(first + 1, last):
+            px, py = path[2 * i], path[2 * i + 1]
+            if length > 0:
+                dist = abs(dy * (px - x1) - dx * (py - y1)) / length
+            else:
+                dist = math.hypot(px - x1, py - y1)
+            if dist > max_dist:
+                max_dist = dist
+                max_index = i
+
+        if max_dist > tolerance:
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+
+    simplified = array("h")
+    for i in range(count):
+        if keep[i]:
+            simplified.extend((path[2 * i], path[2 * i + 1]))
+    return simplified
+
+
+def draw_thick_path(target, path, thickness, color):
+    """Draw a flat (x, y, x, y, ...) path with simulated thickness"""
+    for i in range(0, len(path) - 2, 2):
+        x1, y1, x2, y2 = path[i : i + 4]
+        target.line(x1, y1, x2, y2, color)
+
+        # Thick line simulation
+        for offset in range(thickness):
+            target.line(x1 + offset, y1, x2 + offset, y2, color)
+            if offset > 0:
+                target.line(x1, y1 + offset, x2, y2 + offset, color)
 
 
 class QuietPointAndLine:
@@ -35,6 +91,10 @@ class QuietPointAndLine:
         self.static_points = []  # Static points
         self.large_shapes = []  # Large forms
 
+        # Completed lines are rasterized once into this layer
+        self.line_layer = pyxel.Image(512, 512)
+        self.line_layer_dirty = False
+
         # Generate initial points and elements
         self.spawn_initial_points()
 
@@ -70,11 +130,17 @@ class QuietPointAndLine:
         end_x = max(20, min(492, end_x))
         end_y = max(20, min(492, end_y))
 
+        # Fixed intermediate control point for the curve
+        control_x = (start_x + end_x) / 2 + random.uniform(-20, 20)
+        control_y = (start_y + end_y) / 2 + random.uniform(-20, 20)
+
         point = {
             "start_x": start_x,
             "start_y": start_y,
             "end_x": end_x,
             "end_y": end_y,
+            "control_x": control_x,
+            "control_y": control_y,
             "current_x": start_x,
             "current_y": start_y,
             "progress": 0.0,
@@ -82,7 +148,7 @@ class QuietPointAndLine:
             "color": random.choice([8, 10, 11, 12, 14]),
             "thickness": random.randint(1, 4),  # Thicker lines
             "birth_time": self.time,
-            "path": [(start_x, start_y)],  # Record trajectory
+            "path": array("h", (start_x, start_y)),  # Record trajectory
             "last_sound": 0,
             "sound_interval": random.randint(30, 90),
         }
@@ -144,28 +210,24 @@ class QuietPointAndLine:
                 # Easing function for natural movement
                 eased_t = t * t * (3.0 - 2.0 * t)
 
-                # Add intermediate control point for curves
-                mid_x = (point["start_x"] + point["end_x"]) / 2 + random.uniform(
-                    -20, 20
-                )
-                mid_y = (point["start_y"] + point["end_y"]) / 2 + random.uniform(
-                    -20, 20
-                )
-
                 # Quadratic Bezier curve
                 point["current_x"] = (
                     (1 - eased_t) ** 2 * point["start_x"]
-                    + 2 * (1 - eased_t) * eased_t * mid_x
+                    + 2 * (1 - eased_t) * eased_t * point["control_x"]
                     + eased_t**2 * point["end_x"]
                 )
                 point["current_y"] = (
                     (1 - eased_t) ** 2 * point["start_y"]
-                    + 2 * (1 - eased_t) * eased_t * mid_y
+                    + 2 * (1 - eased_t) * eased_t * point["control_y"]
                     + eased_t**2 * point["end_y"]
                 )
 
-                # Add to trajectory
-                point["path"].append((int(point["current_x"]), int(point["current_y"])))
+                # Add to trajectory only once the point moves a whole pixel
+                path = point["path"]
+                x = int(point["current_x"])
+                y = int(point["current_y"])
+                if x != path[-2] or y != path[-1]:
+                    path.extend((x, y))
 
                 # Drawing sound (variation)
                 if self.time - point["last_sound"] > point["sound_interval"]:
@@ -180,16 +242,25 @@ class QuietPointAndLine:
             else:
                 # Line completion
                 completed_line = {
-                    "path": point["path"],
+                    "path": simplify_path(point["path"]),
                     "color": point["color"],
                     "thickness": point["thickness"],
                     "fade_time": 0,
                     "max_fade": random.randint(300, 600),  # 5-10 seconds to disappear
+                    "fade_color": point["color"],
                 }
 
                 self.completed_lines.append(completed_line)
                 self.drawing_points.remove(point)
 
+                # Newest line lies on top, so it can be added in place
+                draw_thick_path(
+                    self.line_layer,
+                    completed_line["path"],
+                    completed_line["thickness"],
+                    completed_line["color"],
+                )
+
                 # Completion sound (variation)
                 if random.random() < 0.6:
                     sound_choice = random.choice([2, 8])  # Completion sound, arpeggio
@@ -200,6 +271,13 @@ class QuietPointAndLine:
             line["fade_time"] += 1
             if line["fade_time"] > line["max_fade"]:
                 self.completed_lines.remove(line)
+                self.line_layer_dirty = True
+            else:
+                # Redraw the layer only when a line crosses a fade stage
+                color = self.get_fade_color(line)
+                if color != line["fade_color"]:
+                    line["fade_color"] = color
+                    self.line_layer_dirty = True
 
         # Update static points
         for point in self.static_points[:]:
@@ -243,6 +321,7 @@ class QuietPointAndLine:
         # Remove old lines (max number limit)
         if len(self.completed_lines) > self.max_lines:
             self.completed_lines.pop(0)
+            self.line_layer_dirty = True
 
         # Generate new elements randomly
         if random.random() < 0.015:  # Drawing points
@@ -256,36 +335,37 @@ class QuietPointAndLine:
 
         self.time += 1
 
+    def get_fade_color(self, line):
+        """Color of a completed line at its current fade stage"""
+        fade_ratio = 1.0 - (line["fade_time"] / line["max_fade"])
+
+        # Fade effect as color thinning
+        if fade_ratio > 0.7:
+            return line["color"]
+        elif fade_ratio > 0.4:
+            return max(1, line["color"] - 1)
+        elif fade_ratio > 0.2:
+            return max(1, line["color"] - 2)
+        else:
+            return 1
+
+    def render_line_layer(self):
+        """Rasterize all completed lines into the line layer"""
+        self.line_layer.cls(0)
+        for line in self.completed_lines:
+            draw_thick_path(
+                self.line_layer, line["path"], line["thickness"], line["fade_color"]
+            )
+        self.line_layer_dirty = False
+
     def draw(self):
         # Warm background color
         pyxel.cls(0)
 
         # Draw completed lines (with fade effect)
-        for line in self.completed_lines:
-            fade_ratio = 1.0 - (line["fade_time"] / line["max_fade"])
-
-            # Fade effect as color thinning
-            if fade_ratio > 0.7:
-                color = line["color"]
-            elif fade_ratio > 0.4:
-                color = max(1, line["color"] - 1)
-            elif fade_ratio > 0.2:
-                color = max(1, line["color"] - 2)
-            else:
-                color = 1
-
-            # Draw lines
-            path = line["path"]
-            for i in range(len(path) - 1):
-                x1, y1 = path[i]
-                x2, y2 = path[i + 1]
-                pyxel.line(x1, y1, x2, y2, color)
-
-                # Thick line simulation
-                for offset in range(line["thickness"]):
-                    pyxel.line(x1 + offset, y1, x2 + offset, y2, color)
-                    if offset > 0:
-                        pyxel.line(x1, y1 + offset, x2, y2 + offset, color)
+        if self.line_layer_dirty:
+            self.render_line_layer()
+        pyxel.blt(0, 0, self.line_layer, 0, 0, 512, 512, 0)
 
         # Currently drawing lines
         for point in self.drawing_points:
@@ -293,15 +373,7 @@ class QuietPointAndLine:
             color = point["color"]
 
             # Progressive trajectory
-            for i in range(len(path) - 1):
-                x1, y1 = path[i]
-                x2, y2 = path[i + 1]
-                pyxel.line(x1, y1, x2, y2, color)
-
-                for offset in range(point["thickness"]):
-                    pyxel.line(x1 + offset, y1, x2 + offset, y2, color)
-                    if offset > 0:
-                        pyxel.line(x1, y1 + offset, x2, y2 + offset, color)
+            draw_thick_path(pyxel, path, point["thickness"], color)
 
             # Current point (slightly pulsating)
             pulse = 1 + 0.3 * math.sin(self.time * 0.1)
@@ -6,10 +6,31 @@
 # version: 1.0
 
 import pyxel
+import ctypes
 import random
 
+# Random birth probability on exactly two neighbors, as 13/128 (~0.1)
+RANDOM_BIRTH_BITS = 7
+RANDOM_BIRTH_THRESHOLD = 13
+
+
+def full_adder(a, b, c):
+    """Bitwise sum and carry of three bitboards"""
+    partial = a ^ b
+    return partial ^ c, (a & b) | (partial & c)
+
+
+def rect_mask(x, y, width, height, stride):
+    """Bitboard of a filled rectangle"""
+    mask = 0
+    row = ((1 << width) - 1) << x
+    for j in range(y, y + height):
+        mask |= row << (j * stride)
+    return mask
+
+
 class Scan:
-    def __init__(self):
+    def __init__(self, grid_size=32):
         pyxel.init(512, 512, title="Scan")
         
         # Cellular automaton sound definitions
@@ -22,114 +43,170 @@ class Scan:
         
         self.time = 0
         
-        # QR code size and cells
-        self.grid_size = 32  # 32x32 grid
+        # QR code size and cells (32x32 grid; 256 or 512 for high resolution)
+        self.grid_size = grid_size
         self.cell_size = 512 // self.grid_size
+        self.high_resolution = self.cell_size <= 2
         
-        # Cellular automaton grid
-        self.current_grid = [[0 for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        self.next_grid = [[0 for _ in range(self.grid_size)] for _ in range(self.grid_size)]
+        # Cellular automaton grid, bit-packed: cell (x, y) is bit y * stride + x.
+        # A zero guard byte per row keeps horizontal shifts from wrapping and
+        # rows byte-aligned for rendering.
+        self.stride = self.grid_size + 8
+        self.row_mask = (1 << self.grid_size) - 1
+        self.cell_bits = self.grid_size * self.stride
+        self.valid_mask = rect_mask(0, 0, self.grid_size, self.grid_size, self.stride)
+        self.board = 0
         
-        # Target marker positions and sizes
+        # Target marker positions and sizes (scaled from the 32x32 layout)
+        scale = self.grid_size // 32
         self.markers = [
-            {"x": 1, "y": 1, "size": 8},      # Top-left (large)
-            {"x": 23, "y": 1, "size": 8},     # Top-right (large)
-            {"x": 1, "y": 23, "size": 8},     # Bottom-left (large)
-            {"x": 23, "y": 27, "size": 4}     # Bottom-right (small)
+            {"x": 1 * scale, "y": 1 * scale, "size": 8 * scale},      # Top-left (large)
+            {"x": 23 * scale, "y": 1 * scale, "size": 8 * scale},     # Top-right (large)
+            {"x": 1 * scale, "y": 23 * scale, "size": 8 * scale},     # Bottom-left (large)
+            {"x": 23 * scale, "y": 27 * scale, "size": 4 * scale}     # Bottom-right (small)
         ]
+        self.marker_scale = scale
         
         # Cellular automaton parameters
         self.generation = 0
         self.generation_timer = 0
         self.generation_interval = 30  # Frame count
+        if self.high_resolution:
+            self.generation_interval = 1  # Every frame
         
         # Initialize
+        self.marker_mask = self.build_marker_mask()
+        self.marker_pattern = self.build_marker_pattern()
         self.setup_markers()
         self.randomize_automaton_area()
+
+        # High resolution: live cells rendered into a framebuffer in one pass
+        if self.high_resolution:
+            self.framebuffer = bytearray(512 * 512)
+            self.framebuffer_view = (ctypes.c_ubyte * len(self.framebuffer)).from_buffer(
+                self.framebuffer
+            )
+            # 8 cells of a board byte -> pixels (live black on white)
+            self.byte_pixels = [
+                bytes(
+                    color
+                    for i in range(8)
+                    for color in [0 if byte >> i & 1 else 7] * self.cell_size
+                )
+                for byte in range(256)
+            ]
         
         pyxel.run(self.update, self.draw)
     
-    def setup_markers(self):
-        """Set up target markers"""
+    def cell_bit(self, x, y):
+        return 1 << (y * self.stride + x)
+
+    def set_cell(self, x, y, value):
+        if value:
+            self.board |= self.cell_bit(x, y)
+        else:
+            self.board &= ~self.cell_bit(x, y)
+
+    def build_marker_mask(self):
+        """Bitboard of all marker areas (left untouched by the automaton)"""
+        mask = 0
         for marker in self.markers:
             x, y, size = marker["x"], marker["y"], marker["size"]
+            mask |= rect_mask(x, y, size, size, self.stride)
+        return mask & self.valid_mask
+
+    def build_marker_pattern(self):
+        """Bitboard of the marker frames and inner squares"""
+        pattern = 0
+        for marker in self.markers:
+            x, y, size = marker["x"], marker["y"], marker["size"]
+            ring = self.marker_scale
             
             # Outer frame
-            for i in range(size):
-                for j in range(size):
-                    if i == 0 or i == size-1 or j == 0 or j == size-1:
-                        if 0 <= x+i < self.grid_size and 0 <= y+j < self.grid_size:
-                            self.current_grid[y+j][x+i] = 1
+            outer = rect_mask(x, y, size, size, self.stride)
+            inner = rect_mask(x + ring, y + ring, size - 2 * ring, size - 2 * ring, self.stride)
+            pattern |= outer & ~inner
             
             # Inner square (for size 6 or larger)
-            if size >= 6:
-                inner_start = 2
-                inner_end = size - 2
-                for i in range(inner_start, inner_end):
-                    for j in range(inner_start, inner_end):
-                        if 0 <= x+i < self.grid_size and 0 <= y+j < self.grid_size:
-                            self.current_grid[y+j][x+i] = 1
+            if size >= 6 * ring:
+                inner_start = 2 * ring
+                inner_size = size - 2 * inner_start
+                pattern |= rect_mask(
+                    x + inner_start, y + inner_start, inner_size, inner_size, self.stride
+                )
+        return pattern & self.valid_mask
+
+    def setup_markers(self):
+        """Set up target markers"""
+        self.board |= self.marker_pattern
     
     def randomize_automaton_area(self):
         """Randomly initialize cellular automaton area"""
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                if not self.is_marker_area(x, y):
-                    self.current_grid[y][x] = random.choice([0, 1])
+        noise = random.getrandbits(self.cell_bits) & self.valid_mask
+        self.board = (self.board & self.marker_mask) | (noise & ~self.marker_mask)
     
     def is_marker_area(self, x, y):
         """Check if specified coordinates are in marker area"""
-        for marker in self.markers:
-            mx, my, size = marker["x"], marker["y"], marker["size"]
-            if mx <= x < mx + size and my <= y < my + size:
-                return True
-        return False
+        return bool(self.marker_mask & self.cell_bit(x, y))
+
+    def random_birth_mask(self):
+        """Bitboard with each cell set with RANDOM_BIRTH_THRESHOLD / 128"""
+        # Bit-sliced comparison of a random 7-bit number per cell with the threshold
+        below = 0
+        equal = self.valid_mask
+        for bit in reversed(range(RANDOM_BIRTH_BITS)):
+            plane = random.getrandbits(self.cell_bits)
+            if RANDOM_BIRTH_THRESHOLD >> bit & 1:
+                below |= equal & ~plane
+                equal &= plane
+            else:
+                equal &= ~plane
+        return below
     
     def apply_cellular_automaton(self):
         """Apply cellular automaton rules"""
-        # Initialize next generation grid
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                self.next_grid[y][x] = self.current_grid[y][x]
-        
-        # Apply cellular automaton rules
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                if not self.is_marker_area(x, y):
-                    neighbors = self.count_neighbors(x, y)
-                    current_cell = self.current_grid[y][x]
-                    
-                    # Conway's Game of Life variation
-                    if current_cell == 1:  # Living cell
-                        if neighbors < 2 or neighbors > 3:
-                            self.next_grid[y][x] = 0  # Death
-                    else:  # Dead cell
-                        if neighbors == 3:
-                            self.next_grid[y][x] = 1  # Birth
-                        elif neighbors == 2 and random.random() < 0.1:  # Random element
-                            self.next_grid[y][x] = 1
-        
-        # Update grid
-        self.current_grid, self.next_grid = self.next_grid, self.current_grid
-        
-        # Reset markers (protection)
-        self.setup_markers()
+        board = self.board
+        stride = self.stride
+
+        # Eight neighbor bitboards by shifting
+        west = board << 1
+        east = board >> 1
+        neighbors = [
+            board << stride,
+            board >> stride,
+            west << stride,
+            west >> stride,
+            east << stride,
+            east >> stride,
+            west,
+            east,
+        ]
+
+        # Add the eight boards into a per-cell count (ones, twos, fours+)
+        ones_a, twos_a = full_adder(*neighbors[0:3])
+        ones_b, twos_b = full_adder(*neighbors[3:6])
+        ones_c, twos_c = neighbors[6] ^ neighbors[7], neighbors[6] & neighbors[7]
+        ones, twos_d = full_adder(ones_a, ones_b, ones_c)
+        twos, fours_a = full_adder(twos_a, twos_b, twos_c)
+        fours_b = twos & twos_d
+        twos ^= twos_d
+        crowded = fours_a | fours_b
+
+        exactly_two = ~ones & twos & ~crowded
+        exactly_three = ones & twos & ~crowded
+
+        # Conway's Game of Life variation: survival on 2-3, birth on 3,
+        # and random birth on 2 (random element)
+        born_by_chance = exactly_two & ~board & self.random_birth_mask()
+        next_board = exactly_three | (board & exactly_two) | born_by_chance
+
+        # Markers are protected
+        self.board = (next_board & self.valid_mask & ~self.marker_mask) | (
+            board & self.marker_mask
+        )
         
         self.generation += 1
     
-    def count_neighbors(self, x, y):
-        """Count neighboring living cells"""
-        count = 0
-        for dy in [-1, 0, 1]:
-            for dx in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.grid_size and 0 <= ny < self.grid_size:
-                    count += self.current_grid[ny][nx]
-        return count
-    
     def play_generation_sound(self):
         """Play sound when generation changes"""
         # Select random scale sound
@@ -150,21 +227,18 @@ class Scan:
                 y = random.randint(0, self.grid_size - 1)
                 
                 if not self.is_marker_area(x, y):
-                    self.current_grid[y][x] = random.choice([0, 1])
+                    self.set_cell(x, y, random.choice([0, 1]))
     
     def check_stagnation(self):
         """Check stagnation and inject new patterns"""
         if self.generation % 100 == 0:  # Every 100 generations
             # Inject random pattern in center area
-            center_x = self.grid_size // 2
-            center_y = self.grid_size // 2
-            
-            for dy in range(-3, 4):
-                for dx in range(-3, 4):
-                    x, y = center_x + dx, center_y + dy
-                    if (0 <= x < self.grid_size and 0 <= y < self.grid_size and 
-                        not self.is_marker_area(x, y)):
-                        self.current_grid[y][x] = random.choice([0, 1])
+            reach = 3 * self.marker_scale
+            corner = self.grid_size // 2 - reach
+            area = rect_mask(corner, corner, 2 * reach + 1, 2 * reach + 1, self.stride)
+            area &= self.valid_mask & ~self.marker_mask
+            noise = random.getrandbits(self.cell_bits)
+            self.board = (self.board & ~area) | (noise & area)
     
     def update(self):
         if pyxel.btnp(pyxel.KEY_Q):
@@ -177,8 +251,9 @@ class Scan:
             # Evolve cellular automaton to next generation
             self.apply_cellular_automaton()
             
-            # Play sound
-            self.play_generation_sound()
+            # Play sound (sparser when generations run every frame)
+            if not self.high_resolution or self.generation % 35 == 0:
+                self.play_generation_sound()
             
             # Add random noise
             self.add_random_noise()
@@ -190,7 +265,8 @@ class Scan:
             self.generation_timer = 0
             
             # Randomly change interval
-            self.generation_interval = random.randint(20, 50)
+            if not self.high_resolution:
+                self.generation_interval = random.randint(20, 50)
         
         # Background sound
         if self.time % 200 == 0 and random.random() < 0.2:
@@ -199,18 +275,45 @@ class Scan:
         
         self.time += 1
     
+    def draw_high_resolution(self):
+        """Render the board into the framebuffer and copy it to the screen"""
+        data = self.board.to_bytes(self.cell_bits // 8 + 1, "little")
+        row_bytes = self.grid_size // 8
+        stride_bytes = self.stride // 8
+        framebuffer = self.framebuffer
+        byte_pixels = self.byte_pixels
+        offset = 0
+        for y in range(self.grid_size):
+            start = y * stride_bytes
+            row = b"".join([byte_pixels[b] for b in data[start : start + row_bytes]])
+            for _ in range(self.cell_size):
+                framebuffer[offset : offset + 512] = row
+                offset += 512
+        ctypes.memmove(pyxel.screen.data_ptr(), self.framebuffer_view, len(framebuffer))
+
     def draw(self):
+        if self.high_resolution:
+            self.draw_high_resolution()
+        else:
+            self.draw_grid()
+
+        self.draw_overlay()
+
+    def draw_grid(self):
         # White background
         pyxel.cls(7)
         
-        # Draw cellular automaton grid
+        # Draw cellular automaton grid, one rect per horizontal run
+        cell_size = self.cell_size
         for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                if self.current_grid[y][x] == 1:
-                    px = x * self.cell_size
-                    py = y * self.cell_size
-                    pyxel.rect(px, py, self.cell_size, self.cell_size, 0)
-        
+            row = (self.board >> (y * self.stride)) & self.row_mask
+            while row:
+                x = (row & -row).bit_length() - 1
+                run = ((row >> x) ^ ((row >> x) + 1)).bit_length() - 1
+                pyxel.rect(x * cell_size, y * cell_size, run * cell_size, cell_size, 0)
+                row &= ~(((1 << run) - 1) << x)
+
+    def draw_overlay(self):
         # Scan effect (occasionally show scan lines)
         if self.time % 120 < 60:
             scan_y = (self.time % 120) * (512 // 60)
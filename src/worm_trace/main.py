@@ -6,12 +6,275 @@
 # version: 1.0
 
 import pyxel
+import ctypes
 import random
 import math
+from array import array
+from collections import deque
+
+# Occupancy lattice: one cell per movement step
+LATTICE_STEP = 10
+LATTICE_SIZE = 512 // LATTICE_STEP + 1
+
+# Swarm mode: up, right, down, left
+SWARM_DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+SWARM_BACKGROUND = 15
+
+# Swarm lattice steps, coarsest first; the first that fits every body is used
+SWARM_STEPS = (8, 4, 2, 1)
+SWARM_HEADROOM = 1.25  # Lattice cells per body segment at full length
+
+# Frames a blocked worm waits before backing out, or shedding its tail if boxed in
+SWARM_PATIENCE = 8
+
+# Body colors by segment index, applied as segments pass these indices
+SWARM_BODY_BANDS = [(1, 0), (5, 1), (20, 5), (50, 6)]
+
+# Trail fade bands: (fade progress, color after it); None clears the cell
+TRAIL_BANDS = [(0.3, 5), (0.6, 6), (1.0, None)]
+
+
+class WormSwarm:
+    """Many worms on one shared occupancy lattice, drawn into a framebuffer"""
+
+    def __init__(self, count, max_length, step, fade_duration):
+        # Coarsest lattice that holds every body at full length, with headroom
+        if step is None:
+            needed = count * max_length * SWARM_HEADROOM
+            step = next(
+                (s for s in SWARM_STEPS if (512 // s) ** 2 >= needed), SWARM_STEPS[-1]
+            )
+        self.step = step
+        self.size = 512 // step
+        cells = self.size * self.size
+
+        # Cap the length if even the finest lattice cannot hold the swarm
+        max_length = max(1, min(max_length, int(cells / (count * SWARM_HEADROOM))))
+        self.count = count
+        self.max_length = max_length
+        self.capacity = max_length + 1  # Ring holds one extra before the tail drops
+        self.fade_duration = fade_duration
+
+        # Shared occupancy lattice
+        self.occupancy = bytearray(cells)
+
+        # Bodies as ring buffers of lattice cells, one slice per worm
+        self.body = array("l", [0]) * (count * self.capacity)
+        self.head = [0] * count
+        self.length = [0] * count
+        self.direction = [0] * count
+        self.blocked = [0] * count  # Consecutive frames without a free cell
+
+        # Trail cells: fade start per cell and one FIFO per fade band
+        self.trail_start = array("l", [-1]) * cells
+        self.trail_queues = [deque() for _ in TRAIL_BANDS]
+
+        # Framebuffer copied to the screen in one transfer
+        self.framebuffer = bytearray([SWARM_BACKGROUND]) * (512 * 512)
+        self.framebuffer_view = (ctypes.c_ubyte * len(self.framebuffer)).from_buffer(
+            self.framebuffer
+        )
+        self.color_rows = [bytes([color]) * step for color in range(16)]
+
+        # Body color by segment index, up to the last band
+        self.band_colors = [8] * (SWARM_BODY_BANDS[-1][0] + 1)
+        for index, color in SWARM_BODY_BANDS:
+            self.band_colors[index:] = [color] * (len(self.band_colors) - index)
+
+        for worm in range(count):
+            self.spawn(worm)
+
+    def paint(self, cell, color):
+        """Fill one lattice cell in the framebuffer"""
+        step = self.step
+        row = self.color_rows[color]
+        offset = (cell // self.size) * step * 512 + (cell % self.size) * step
+        for _ in range(step):
+            self.framebuffer[offset : offset + step] = row
+            offset += 512
+
+    def neighbor(self, cell, direction):
+        """Adjacent lattice cell, or -1 past the walls"""
+        dx, dy = SWARM_DIRECTIONS[direction]
+        x = cell % self.size + dx
+        y = cell // self.size + dy
+        if 0 <= x < self.size and 0 <= y < self.size:
+            return y * self.size + x
+        return -1
+
+    def choose_move(self, cell, direction):
+        """Direction and cell for the next step, toward the most open cell"""
+        next_cell = self.neighbor(cell, direction)
+        if self.openness(next_cell, direction) > 1:
+            return direction, next_cell
+        best = None
+        best_open = 0
+        options = [(direction + turn) % 4 for turn in (-1, 0, 1)]
+        random.shuffle(options)
+        for option in options:
+            candidate = self.neighbor(cell, option)
+            open_count = self.openness(candidate, option)
+            if open_count > best_open:
+                best, best_open = (option, candidate), open_count
+        return best
+
+    def openness(self, cell, direction):
+        """1 + free cells ahead of a free cell, or 0 if it is taken"""
+        if cell < 0 or self.occupancy[cell]:
+            return 0
+        count = 1
+        for turn in (-1, 0, 1):
+            ahead = self.neighbor(cell, (direction + turn) % 4)
+            if ahead >= 0 and not self.occupancy[ahead]:
+                count += 1
+        return count
+
+    def spawn(self, worm):
+        """Place a worm on a random free cell"""
+        self.length[worm] = 0
+        for _ in range(20):
+            cell = random.randrange(self.size * self.size)
+            if not self.occupancy[cell]:
+                self.head[worm] = 0
+                self.body[worm * self.capacity] = cell
+                self.length[worm] = 1
+                self.direction[worm] = random.randrange(4)
+                self.occupancy[cell] = 1
+                self.paint(cell, 8)
+                return
+
+    def drop_tail(self, cell, time):
+        """Free a tail cell and leave it fading as trail"""
+        self.occupancy[cell] = 0
+        self.paint(cell, 1)
+        self.trail_start[cell] = time
+        self.trail_queues[0].append((time, cell))
+
+    def wait(self, worm, time):
+        """Hold a blocked worm in place, then back out or shed its tail"""
+        blocked = self.blocked[worm] + 1
+        self.blocked[worm] = blocked
+        if blocked <= SWARM_PATIENCE:
+            return
+        self.blocked[worm] = 0
+
+        capacity = self.capacity
+        base = worm * capacity
+        head = self.head[worm]
+        length = self.length[worm]
+        tail = self.body[base + (head - length + 1) % capacity]
+        for direction in range(4):
+            cell = self.neighbor(tail, direction)
+            if cell >= 0 and not self.occupancy[cell]:
+                self.reverse(worm)
+                return
+
+        # Boxed in at both ends: shrink so the body can unwind
+        if length > 1:
+            self.drop_tail(tail, time)
+            self.length[worm] = length - 1
+
+    def reverse(self, worm):
+        """Swap head and tail, keeping the whole body on the lattice"""
+        capacity = self.capacity
+        base = worm * capacity
+        head = self.head[worm]
+        length = self.length[worm]
+        cells = [self.body[base + (head - k) % capacity] for k in range(length)]
+        self.body[base : base + length] = array("l", cells)
+        self.head[worm] = length - 1
+        if length > 1:
+            # Point away from the segment behind the new head
+            dx = cells[-1] % self.size - cells[-2] % self.size
+            dy = cells[-1] // self.size - cells[-2] // self.size
+            self.direction[worm] = SWARM_DIRECTIONS.index((dx, dy))
+
+        # Repaint both banded ends; the middle of the body is one color
+        colors = self.band_colors
+        banded = min(length, len(colors))
+        for index in range(banded):
+            self.paint(cells[length - 1 - index], colors[index])
+        for index in range(max(banded, length - banded), length):
+            self.paint(cells[length - 1 - index], colors[-1])
+
+    def step_worm(self, worm, time):
+        """Advance one worm by one lattice step"""
+        length = self.length[worm]
+        if length == 0:
+            self.spawn(worm)
+            return
+
+        capacity = self.capacity
+        base = worm * capacity
+        head = self.head[worm]
+        cell = self.body[base + head]
+        direction = self.direction[worm]
+        occupancy = self.occupancy
+
+        # Random direction change (never straight back)
+        if random.random() < 0.12:
+            direction = (direction + random.choice((-1, 0, 1))) % 4
+
+        move = self.choose_move(cell, direction)
+        if move is None:
+            # No direction available, wait for a neighbor to move on
+            self.wait(worm, time)
+            return
+        direction, next_cell = move
+        self.direction[worm] = direction
+        self.blocked[worm] = 0
+
+        # Move worm
+        head = (head + 1) % capacity
+        self.head[worm] = head
+        self.body[base + head] = next_cell
+        occupancy[next_cell] = 1
+        self.paint(next_cell, 8)
+        length += 1
+
+        # Recolor segments that crossed a body color band
+        for index, color in SWARM_BODY_BANDS:
+            if index < length:
+                self.paint(self.body[base + (head - index) % capacity], color)
+
+        # Maintain maximum length
+        if length > self.max_length:
+            length -= 1
+            self.drop_tail(self.body[base + (head - length) % capacity], time)
+        self.length[worm] = length
+
+    def update_trails(self, time):
+        """Move trail cells to their next fade band, oldest first"""
+        for band, (progress, color) in enumerate(TRAIL_BANDS):
+            queue = self.trail_queues[band]
+            limit = progress * self.fade_duration
+            while queue and time - queue[0][0] >= limit:
+                start, cell = queue.popleft()
+
+                # Skip cells re-trailed since, or covered by a body again
+                if self.trail_start[cell] != start or self.occupancy[cell]:
+                    continue
+
+                if color is None:
+                    self.paint(cell, SWARM_BACKGROUND)
+                    self.trail_start[cell] = -1
+                else:
+                    self.paint(cell, color)
+                    self.trail_queues[band + 1].append((start, cell))
+
+    def update(self, time):
+        for worm in range(self.count):
+            self.step_worm(worm, time)
+        self.update_trails(time)
+
+    def draw(self):
+        ctypes.memmove(
+            pyxel.screen.data_ptr(), self.framebuffer_view, len(self.framebuffer)
+        )
 
 
 class WormTrace:
-    def __init__(self):
+    def __init__(self, swarm=0, max_length=200, swarm_step=None):
         pyxel.init(512, 512, title="Worm Trace")
 
         # Sound definitions
@@ -22,8 +285,10 @@ class WormTrace:
         self.time = 0
 
         # Worm properties
-        self.worm_body = [(256, 256)]  # Start at center
-        self.max_length = 200  # Maximum worm length
+        self.worm_body = deque()
+        self.occupancy = bytearray(LATTICE_SIZE * LATTICE_SIZE)
+        self.place_head(256, 256)  # Start at center
+        self.max_length = max_length  # Maximum worm length
         self.direction = random.choice(
             [(0, -1), (1, 0), (0, 1), (-1, 0)]
         )  # Up, Right, Down, Left
@@ -39,6 +304,16 @@ class WormTrace:
         self.trail_fade = {}  # Position -> fade_time
         self.fade_duration = 300  # Frames to fade
 
+        # Trail entries in fade order, one FIFO per fade band, drawn into a layer
+        self.trail_queues = [deque() for _ in TRAIL_BANDS]
+        self.trail_layer = pyxel.Image(512, 512)
+        self.trail_layer.cls(0)
+
+        # Optional swarm of many worms sharing one lattice
+        self.swarm = None
+        if swarm > 0:
+            self.swarm = WormSwarm(swarm, max_length, swarm_step, self.fade_duration)
+
         pyxel.run(self.update, self.draw)
 
     def get_opposite_direction(self, direction):
@@ -52,23 +327,37 @@ class WormTrace:
         opposite = self.get_opposite_direction(self.direction)
         return [d for d in all_directions if d != opposite]
 
+    def place_head(self, x, y):
+        """Start a new body at (x, y), aligning the lattice to it"""
+        self.worm_body.clear()
+        self.occupancy = bytearray(LATTICE_SIZE * LATTICE_SIZE)
+        self.lattice_origin = (x % LATTICE_STEP, y % LATTICE_STEP)
+        self.worm_body.append((x, y))
+        self.occupancy[self.lattice_index(x, y)] = 1
+
+    def lattice_index(self, x, y):
+        """Occupancy cell of a position on the worm's step lattice"""
+        ox, oy = self.lattice_origin
+        return ((y - oy) // LATTICE_STEP) * LATTICE_SIZE + (x - ox) // LATTICE_STEP
+
     def check_collision(self, x, y):
         """Check if position collides with walls or worm body"""
         # Wall collision
         if x < 10 or x >= 502 or y < 10 or y >= 502:
             return True
 
-        # Self collision (check against body except head)
-        for i, (bx, by) in enumerate(self.worm_body[1:], 1):
-            if abs(x - bx) < 3 and abs(y - by) < 3:
-                return True
-
-        return False
+        # Self collision (moves never land on the head itself)
+        return self.occupancy[self.lattice_index(x, y)] == 1
 
     def update(self):
         if pyxel.btnp(pyxel.KEY_Q):
             pyxel.quit()
 
+        if self.swarm:
+            self.swarm.update(self.time)
+            self.time += 1
+            return
+
         self.move_timer += 1
 
         if self.move_timer >= self.move_interval:
@@ -123,54 +412,79 @@ class WormTrace:
                     return
 
             # Move worm
-            self.worm_body.insert(0, (next_x, next_y))
+            self.worm_body.appendleft((next_x, next_y))
+            self.occupancy[self.lattice_index(next_x, next_y)] = 1
 
             # Maintain maximum length
             if len(self.worm_body) > self.max_length:
                 removed_pos = self.worm_body.pop()
+                self.occupancy[self.lattice_index(*removed_pos)] = 0
                 # Add to trail fade
-                self.trail_fade[removed_pos] = self.time
+                self.add_trail(removed_pos)
 
                 # Growth sound occasionally
                 if random.random() < 0.1:
                     pyxel.play(2, 2, loop=False)
 
-        # Update trail fade
-        positions_to_remove = []
-        for pos, fade_start in self.trail_fade.items():
-            if self.time - fade_start > self.fade_duration:
-                positions_to_remove.append(pos)
-
-        for pos in positions_to_remove:
-            del self.trail_fade[pos]
-
         self.time += 1
 
+        # Update trail fade
+        self.update_trails()
+
+    def draw_trail_cell(self, pos, color):
+        x, y = pos
+        self.trail_layer.rect(x - 1, y - 1, 4, 4, color)
+
+    def add_trail(self, pos):
+        """Start fading a position left behind by the tail"""
+        self.trail_fade[pos] = self.time
+        self.trail_queues[0].append((self.time, pos))
+
+        # Dark blue
+        self.draw_trail_cell(pos, 1)
+
+    def update_trails(self):
+        """Move trail entries to their next fade band, oldest first"""
+        for band, (progress, color) in enumerate(TRAIL_BANDS):
+            queue = self.trail_queues[band]
+            limit = progress * self.fade_duration
+            while queue and self.time - queue[0][0] >= limit:
+                fade_start, pos = queue.popleft()
+
+                # Skip entries for positions trailed again since
+                if self.trail_fade.get(pos) != fade_start:
+                    continue
+
+                if color is None:
+                    del self.trail_fade[pos]
+                    self.draw_trail_cell(pos, 0)
+                else:
+                    # Fade from dark to light
+                    self.draw_trail_cell(pos, color)
+                    self.trail_queues[band + 1].append((fade_start, pos))
+
     def reset_worm(self):
         """Reset worm to a random position"""
-        self.worm_body = [(random.randint(50, 462), random.randint(50, 462))]
+        self.place_head(random.randint(50, 462), random.randint(50, 462))
         self.direction = random.choice([(0, -1), (1, 0), (0, 1), (-1, 0)])
         self.trail_fade.clear()
+        for queue in self.trail_queues:
+            queue.clear()
+        self.trail_layer.cls(0)
 
     def draw(self):
+        if self.swarm:
+            self.swarm.draw()
+            pyxel.rect(5, 5, 120, 17, 0)
+            pyxel.rectb(5, 5, 120, 17, 7)
+            pyxel.text(8, 8, f"Worms: {self.swarm.count}", 7)
+            return
+
         # Clear with light background
         pyxel.cls(127)
 
         # Draw fading trail
-        for pos, fade_start in self.trail_fade.items():
-            x, y = pos
-            fade_progress = (self.time - fade_start) / self.fade_duration
-
-            if fade_progress < 1.0:
-                # Fade from dark to light
-                if fade_progress < 0.3:
-                    color = 1  # Dark blue
-                elif fade_progress < 0.6:
-                    color = 5  # Gray
-                else:
-                    color = 6  # Light gray
-
-                pyxel.rect(x - 1, y - 1, 4, 4, color)
+        pyxel.blt(0, 0, self.trail_layer, 0, 0, 512, 512, 0)
 
         # Draw worm body
         for i, (x, y) in enumerate(self.worm_body):